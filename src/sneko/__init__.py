@@ -1,9 +1,9 @@
-from sneko.app import Sneko
+import time
 
+# Taken before the heavy imports below, so startup reports include them
+STARTED_AT = time.perf_counter()
 
-def main():
-    Sneko().run()
-
+from sneko.app import Sneko, main  # noqa: E402
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,339 @@
+import json
+import re
+
+from decimal import Decimal, InvalidOperation
+from eth_hash.auto import keccak
+
+TX_MUTABILITIES = ("nonpayable", "payable")
+
+
+def eth_utils():
+    """The eth_utils module, imported on first use.
+
+    It is slow to import, and only needed once a call is made or a contract
+    is deployed, so it's kept off the startup path.
+    """
+
+    import eth_utils
+
+    return eth_utils
+
+
+def canonical_type(param: dict) -> str:
+    """The type of an ABI parameter as it appears in a signature.
+
+    Tuples are expanded into their components, e.g. `(uint256,address)[]`.
+    """
+
+    abi_type = param["type"]
+    if abi_type.startswith("tuple"):
+        components = ",".join(canonical_type(c) for c in param["components"])
+        return f"({components}){abi_type[len('tuple'):]}"
+    return abi_type
+
+
+def describe_inputs(inputs: list) -> str:
+    """Human readable argument list, e.g. `address to, uint256 amount`."""
+
+    return ", ".join(f"{arg['type']} {arg['name']}".strip() for arg in inputs)
+
+
+class Quoted(str):
+    """A scalar argument the user wrote in quotes."""
+
+
+def _skip_whitespace(text: str, i: int) -> int:
+    while i < len(text) and text[i].isspace():
+        i += 1
+    return i
+
+
+def _parse_quoted(text: str, i: int):
+    start, quote = i, text[i]
+    chars = []
+    i += 1
+    while i < len(text):
+        char = text[i]
+        if char == "\\" and i + 1 < len(text):
+            chars.append(text[i + 1])
+            i += 2
+            continue
+        if char == quote:
+            return Quoted("".join(chars)), i + 1
+        chars.append(char)
+        i += 1
+    raise ValueError(f"unterminated string starting at position {start}")
+
+
+def _parse_sequence(text: str, i: int, closer):
+    items = []
+    i = _skip_whitespace(text, i)
+    if closer and i < len(text) and text[i] == closer:
+        return items, i + 1
+
+    while True:
+        i = _skip_whitespace(text, i)
+        if i < len(text) and text[i] in "[(":
+            value, i = _parse_sequence(text, i + 1, "]" if text[i] == "[" else ")")
+        elif i < len(text) and text[i] in "\"'":
+            value, i = _parse_quoted(text, i)
+        else:
+            start = i
+            while i < len(text) and text[i] not in ",])":
+                i += 1
+            value = text[start:i].strip()
+        items.append(value)
+
+        i = _skip_whitespace(text, i)
+        if i == len(text):
+            if closer:
+                raise ValueError(f"missing '{closer}'")
+            return items, i
+        if text[i] == ",":
+            i += 1
+        elif text[i] == closer:
+            return items, i + 1
+        else:
+            raise ValueError(f"unexpected '{text[i]}' at position {i}")
+
+
+def parse_arguments(text: str) -> list:
+    """Split an argument string into nested lists of scalar strings.
+
+    Commas separate arguments; `[...]` and `(...)` group arrays and tuples;
+    quotes protect commas and brackets inside strings. For example
+    `[1, 2], ("a, b", 0x01)` parses to `[["1", "2"], ["a, b", "0x01"]]`.
+    """
+
+    items, _ = _parse_sequence(text, 0, None)
+    return items
+
+
+def _scalar(abi_type: str, value) -> str:
+    if isinstance(value, list):
+        raise ValueError(f"expected a single {abi_type}, got a list")
+    return value
+
+
+def _decimal(abi_type: str, value, text: str) -> Decimal:
+    try:
+        return Decimal(text)
+    except InvalidOperation:
+        raise ValueError(f"{value!r} is not a valid {abi_type}") from None
+
+
+def _convert_int(value) -> int:
+    text = _scalar("integer", value).replace("_", "")
+    try:
+        return int(text, 0)
+    except ValueError:
+        pass
+    # e.g. 1e18, or decimal literals with leading zeros
+    number = _decimal("integer", value, text)
+    if not number.is_finite() or number != number.to_integral_value():
+        raise ValueError(f"{value!r} is not an integer")
+    return int(number)
+
+
+def parse_wei(value) -> int:
+    """Parse a payable value field; blank means zero, `1e18` is allowed."""
+
+    return _convert_int(value) if value and value.strip() else 0
+
+
+def _convert_bool(value) -> bool:
+    text = _scalar("bool", value).lower()
+    if text in ("true", "1", "yes"):
+        return True
+    if text in ("false", "0", "no"):
+        return False
+    raise ValueError(f"{value!r} is not a bool")
+
+
+def _convert_address(value) -> str:
+    return eth_utils().to_checksum_address(_scalar("address", value))
+
+
+def _convert_bytes(value) -> bytes:
+    text = _scalar("bytes", value)
+    if text.startswith(("0x", "0X")):
+        return bytes.fromhex(text[2:])
+    if isinstance(text, Quoted):
+        return text.encode("utf8")
+    return bytes.fromhex(text)
+
+
+def _convert_string(value) -> str:
+    return str(_scalar("string", value))
+
+
+def _convert_fixed(value) -> Decimal:
+    number = _decimal("fixed point number", value, _scalar("fixed point number", value))
+    if not number.is_finite():
+        raise ValueError(f"{value!r} is not a valid fixed point number")
+    return number
+
+
+def _convert_other(value):
+    return value
+
+
+ARRAY_REGEX = re.compile(r"^(.*)\[(\d*)\]$")
+SCALAR_CONVERTERS = (
+    ("uint", _convert_int),
+    ("int", _convert_int),
+    ("bool", _convert_bool),
+    ("address", _convert_address),
+    ("bytes", _convert_bytes),
+    ("string", _convert_string),
+    ("ufixed", _convert_fixed),
+    ("fixed", _convert_fixed),
+)
+
+
+def _type_converter(abi_type: str, components):
+    array = ARRAY_REGEX.match(abi_type)
+    if array:
+        convert_element = _type_converter(array.group(1), components)
+        size = int(array.group(2)) if array.group(2) else None
+
+        def convert_array(value) -> list:
+            if not isinstance(value, list):
+                raise ValueError(
+                    f"expected a {abi_type} array like [a, b], got {value!r}"
+                )
+            if size is not None and len(value) != size:
+                raise ValueError(f"{abi_type} needs {size} items, got {len(value)}")
+            return [convert_element(item) for item in value]
+
+        return convert_array
+
+    if abi_type == "tuple":
+        convert_fields = [input_converter(component) for component in components]
+
+        def convert_tuple(value) -> tuple:
+            if not isinstance(value, list):
+                raise ValueError(f"expected a tuple like (a, b), got {value!r}")
+            if len(value) != len(convert_fields):
+                raise ValueError(
+                    f"tuple needs {len(convert_fields)} fields, got {len(value)}"
+                )
+            return tuple(convert(item) for convert, item in zip(convert_fields, value))
+
+        return convert_tuple
+
+    for prefix, converter in SCALAR_CONVERTERS:
+        if abi_type.startswith(prefix):
+            return converter
+    return _convert_other
+
+
+def input_converter(param: dict):
+    """Compile an ABI parameter's type into a converter for parsed input."""
+
+    return _type_converter(param["type"], param.get("components"))
+
+
+def input_converters(inputs: list) -> tuple:
+    """Per-argument converters from user-entered strings to Python values."""
+
+    return tuple(input_converter(arg) for arg in inputs)
+
+
+class AbiFunction:
+    """A function (or constructor) from a contract ABI, parsed once."""
+
+    __slots__ = (
+        "abi",
+        "name",
+        "inputs",
+        "outputs",
+        "signature",
+        "selector",
+        "state_mutability",
+        "is_tx",
+        "is_payable",
+        "placeholder",
+        "converters",
+    )
+
+    def __init__(self, abi: dict):
+        self.abi = abi
+        self.name = abi.get("name", "")
+        self.inputs = abi.get("inputs", [])
+        self.outputs = abi.get("outputs", [])
+        self.signature = (
+            f"{self.name}({','.join(canonical_type(i) for i in self.inputs)})"
+        )
+        self.selector = (
+            keccak(self.signature.encode("utf8"))[:4].hex()
+            if abi["type"] == "function"
+            else None
+        )
+        self.state_mutability = abi.get("stateMutability", "nonpayable")
+        self.is_tx = self.state_mutability in TX_MUTABILITIES
+        self.is_payable = self.state_mutability == "payable"
+        self.placeholder = describe_inputs(self.inputs)
+        self.converters = input_converters(self.inputs)
+
+    def convert_args(self, values: str) -> list:
+        """Given a comma separated string of values, convert to typed data."""
+
+        types = [arg["type"] for arg in self.inputs]
+        # a lone string argument may contain commas without being quoted
+        if types == ["string"]:
+            text = values.strip()
+            if text[:1] in ("'", '"'):
+                quoted, end = _parse_quoted(text, 0)
+                if end == len(text):
+                    return [str(quoted)]
+            return [text]
+
+        args = parse_arguments(values)
+        # a lone array argument may be entered without its brackets
+        if len(types) == 1 and types[0].endswith("]"):
+            if not (len(args) == 1 and isinstance(args[0], list)):
+                args = [args]
+
+        if len(args) != len(self.converters):
+            raise ValueError(
+                f"{self.name or 'constructor'} takes {len(self.converters)} "
+                f"argument(s), got {len(args)}"
+            )
+        return [convert(arg) for convert, arg in zip(self.converters, args)]
+
+    def __repr__(self) -> str:
+        return f"<AbiFunction {self.signature}>"
+
+
+class ContractAbi:
+    """A contract ABI with lookup tables, built once per compile.
+
+    `functions` keeps ABI order; `by_name` maps a name to its first
+    declaration (overloads are reachable through `by_selector`).
+    """
+
+    __slots__ = ("raw", "json", "functions", "by_name", "by_selector", "constructor")
+
+    def __init__(self, raw: list):
+        self.raw = raw
+        self.json = json.dumps(raw)
+        self.functions = [
+            AbiFunction(item) for item in raw if item["type"] == "function"
+        ]
+        self.by_name = {}
+        for fn in self.functions:
+            self.by_name.setdefault(fn.name, fn)
+        self.by_selector = {fn.selector: fn for fn in self.functions}
+        self.constructor = next(
+            (AbiFunction(item) for item in raw if item["type"] == "constructor"),
+            None,
+        )
+
+    @classmethod
+    def from_json(cls, text: str) -> "ContractAbi":
+        return cls(json.loads(text))
+
+    @property
+    def constructor_placeholder(self) -> str:
+        return self.constructor.placeholder if self.constructor else None
@@ -1,22 +1,23 @@
+import asyncio
+import hashlib
 import json
 import os
 import pyperclip
-import solcx
-import subprocess
 import sys
-import vyper
-import tree_sitter_types.parser as tst
+import time
 
 from pathlib import Path
 from rich.syntax import Syntax
 
 from textual import log, on, work
 from textual.app import App, ComposeResult
-from textual.containers import Container, Horizontal
+from textual.containers import Container, Horizontal, Vertical
+from textual.css.query import NoMatches
 from textual.reactive import var, reactive
 from textual.widgets import (
     Button,
     Collapsible,
+    DataTable,
     DirectoryTree,
     Footer,
     Header,
@@ -26,10 +27,40 @@ from textual.widgets import (
     TabbedContent,
     TabPane,
     TextArea,
+    Tree,
+)
+from textual.worker import get_current_worker
+
+from sneko.abi import ContractAbi, parse_wei
+from sneko.balances import BalanceCache
+from sneko.benchmark import (
+    benchmark_path,
+    diff_results,
+    generate_arg_sets,
+    load_results,
+    run_benchmark,
+    save_results,
+)
+from sneko.compare import compile_variants, measure_variant
+from sneko.compiler import (
+    VYPER_VERSION,
+    compile_solidity,
+    compile_vyper,
+    source_map,
 )
-from web3 import Web3, EthereumTesterProvider
-
 from sneko.config import Config
+from sneko.dashboard import ViewDashboard, format_view_value
+from sneko.deployments import DeploymentRegistry
+from sneko.events import EventLog
+from sneko.imports import ImportGraph, source_unit_name
+from sneko.metrics import AGGREGATE_FIELDS, MetricsLog, format_metric, timed
+from sneko.profiler import line_profile, opcode_profile, trace
+from sneko.toolchain import (
+    ensure_solc,
+    installed_solc_versions,
+    load_grammar,
+    select_solc_version,
+)
 from sneko.utils import build_ape_project
 
 # import logging
@@ -47,8 +78,6 @@ from sneko.utils import build_ape_project
 BOLD = Config.BOLD
 RESET = Config.RESET
 SOLIDITY_VERSION = Config.SOLIDITY_VERSION
-solcx.install_solc(SOLIDITY_VERSION)
-solcx.set_solc_version(SOLIDITY_VERSION)
 
 
 class Sneko(App):
@@ -58,6 +87,7 @@ class Sneko(App):
     BINDINGS = Config.BINDINGS
 
     show_tree = var(True)
+    watch_mode = var(False)
     abi = None
     bytecode = None
     w3 = None
@@ -66,6 +96,31 @@ class Sneko(App):
     contract_path = None
     solidity_loaded = False
     vyper_loaded = False
+    solidity_prepared = False
+    ui_ready_at = None
+    compiled_hash = None
+    artifacts = {}
+    abis = {}
+    artifact_name = None
+    contract_abi = None
+    deployed_abi = None
+    deployments = None
+    chain_store = None
+    balance_cache = None
+    metrics = None
+    accounts = []
+    snapshots = []
+    unrendered_fns = {}
+    views = None
+    event_log = None
+    events_version = None
+    compiled_source = None
+    last_call = None
+    profiled = None
+    fn_filter = ""
+    contracts_root = None
+    import_graph = None
+    watch_timer = None
 
     def watch_show_tree(self, show_tree: bool) -> None:
         """Called when show_tree is modified."""
@@ -76,6 +131,7 @@ class Sneko(App):
         """Render the UI"""
 
         path = Config.DEFAULT_CONTRACTS_PATH if len(sys.argv) < 2 else sys.argv[1]
+        self.contracts_root = Path(path).resolve()
 
         yield Header()
         with Collapsible(
@@ -101,8 +157,15 @@ class Sneko(App):
                             id="compiler-version",
                             disabled=True,
                         ),
+                        Select(
+                            (),
+                            prompt="Contract",
+                            id="contract-select",
+                            disabled=True,
+                        ),
                         id="compile-grouping",
                     ),
+                    Static("", id="compile-diagnostics"),
                     Horizontal(
                         Button("Copy ABI", id="copy-abi-button", disabled=True),
                         Input(placeholder="ABI ~", id="abi-view", disabled=True),
@@ -132,6 +195,12 @@ class Sneko(App):
                             variant="primary",
                             disabled=True,
                         ),
+                        Button(
+                            "Compare Optimizers",
+                            id="compare-button",
+                            variant="warning",
+                            disabled=True,
+                        ),
                         id="generate-buttons",
                     ),
                     id="compilation-panel",
@@ -143,6 +212,11 @@ class Sneko(App):
                         Select((), id="acct-select"),
                         id="acct-select-horizontal",
                     ),
+                    Horizontal(
+                        Button("Instance:", id="instance-button"),
+                        Select((), prompt="(nothing deployed)", id="instance-select"),
+                        id="instance-select-horizontal",
+                    ),
                     Static("", id="deploy-address"),
                     Static("", id="contract-balance"),
                     Horizontal(
@@ -162,13 +236,77 @@ class Sneko(App):
                     Static(id="playground-fn-body"),
                     id="playground-panel",
                 )
+            with TabPane("Compare", id="compare-tab"):
+                yield Container(
+                    Static(
+                        "Compile the current contract, then press Compare "
+                        "Optimizers to build and measure every configuration.",
+                        id="compare-status",
+                    ),
+                    DataTable(id="compare-table"),
+                    id="compare-panel",
+                )
+            with TabPane("Events", id="events-tab"):
+                yield Container(
+                    Input(
+                        placeholder="Filter by event name, topic (0x...) or block",
+                        id="events-filter",
+                    ),
+                    DataTable(id="events-table"),
+                    id="events-panel",
+                )
+            with TabPane("Profile", id="profile-tab"):
+                yield Container(
+                    Horizontal(
+                        Button(
+                            "Profile last call", id="profile-button", variant="primary"
+                        ),
+                        Static(
+                            "Call a contract function, then profile it here.",
+                            id="profile-status",
+                        ),
+                        id="profile-horizontal",
+                    ),
+                    DataTable(id="profile-lines", cursor_type="row"),
+                    DataTable(id="profile-opcodes"),
+                    id="profile-panel",
+                )
+            with TabPane("Imports", id="imports-tab"):
+                yield Tree("(select a Solidity file)", id="import-tree")
+            with TabPane("Metrics", id="metrics-tab"):
+                yield Container(
+                    Horizontal(
+                        Button("Export CSV", id="export-csv-button", variant="primary"),
+                        Button(
+                            "Export JSON", id="export-json-button", variant="primary"
+                        ),
+                        id="metrics-buttons",
+                    ),
+                    DataTable(id="metrics-table"),
+                    Horizontal(
+                        Button("Benchmark", id="benchmark-button", variant="warning"),
+                        Input(
+                            placeholder=(
+                                f"runs per argument set (default {Config.BENCHMARK_RUNS})"
+                            ),
+                            id="benchmark-runs",
+                        ),
+                        id="benchmark-horizontal",
+                    ),
+                    DataTable(id="benchmark-table"),
+                    id="metrics-panel",
+                )
         yield Footer()
 
     async def watch_constructor_args(self, constructor_args: str) -> None:
         """Called when constructor_args is modified."""
 
         input = self.query_one("#constructor-args", Input)
-        if constructor_args is None or constructor_args == "":
+        if constructor_args is None:
+            # no contract is loaded
+            input.placeholder = "(Compile contract first!)"
+            input.disabled = True
+        elif constructor_args == "":
             input.placeholder = "(no constructor args)"
             input.disabled = True
         else:
@@ -177,53 +315,212 @@ class Sneko(App):
 
     @work(exclusive=True, thread=True)
     async def load_syntax_highlighting(self) -> None:
-        """In the background, load syntax highlighting for Solidity and Vyper."""
+        """In the background, load syntax highlighting for Solidity and Vyper.
+
+        Prebuilt grammars are loaded straight from disk; a grammar is only
+        fetched and built when it is missing (and never in offline mode).
+        """
 
         code_view = self.query_one("#code-view", TextArea)
+        cold = False
 
         # Solidity
-        tst.install_parser(
-            "https://github.com/JoranHonig/tree-sitter-solidity", "tree-sitter-solidity"
-        )
-        solidity_lang = tst.load_language("tree-sitter-solidity", "solidity")
-        sol_highlight_query = (Path(__file__).parent / "solidity.scm").read_text()
-        code_view.register_language(solidity_lang, sol_highlight_query)
-        self.solidity_loaded = True
+        solidity_lang, installed = self.load_grammar_or_warn("solidity")
+        cold = cold or installed
+        if solidity_lang is not None:
+            sol_highlight_query = (Path(__file__).parent / "solidity.scm").read_text()
+            code_view.register_language(solidity_lang, sol_highlight_query)
+            self.solidity_loaded = True
 
         # Vyper
-        tst.install_parser(
-            "https://github.com/madlabman/tree-sitter-vyper", "tree-sitter-vyper"
+        vyper_lang, installed = self.load_grammar_or_warn("vyper")
+        cold = cold or installed
+        if vyper_lang is not None:
+            vyper_highlight_query = (Path(__file__).parent / "vyper.scm").read_text()
+            code_view.register_language(vyper_lang, vyper_highlight_query)
+            self.vyper_loaded = True
+
+        self.call_from_thread(self.report_startup, cold)
+
+    def load_grammar_or_warn(self, language: str):
+        """`load_grammar`, but a failed fetch or build (e.g. no network)
+        leaves that language's editor as plain text instead of failing."""
+
+        try:
+            return load_grammar(language)
+        except Exception as e:
+            self.call_from_thread(
+                self.notify,
+                f"No {language} syntax highlighting: {e}",
+                severity="warning",
+            )
+            return None, False
+
+    def report_startup(self, cold: bool) -> None:
+        """Log (and optionally notify) how long startup took."""
+
+        from sneko import STARTED_AT
+
+        ui_ready = self.ui_ready_at - STARTED_AT
+        highlighting_ready = time.perf_counter() - STARTED_AT
+        report = (
+            f"{'Cold' if cold else 'Warm'} start: UI ready in {ui_ready:.2f}s, "
+            f"syntax highlighting in {highlighting_ready:.2f}s"
         )
-        vyper_lang = tst.load_language("tree-sitter-vyper", "vyper")
-        vyper_highlight_query = (Path(__file__).parent / "vyper.scm").read_text()
-        code_view.register_language(vyper_lang, vyper_highlight_query)
-        self.vyper_loaded = True
+        log(report)
+        if Config.REPORT_STARTUP:
+            self.notify(report)
+
+    @work(exclusive=True, thread=True, group="solc")
+    def prepare_solidity_compiler(self) -> None:
+        """In the background, install solc if it isn't available locally, and
+        preload the OpenZeppelin sources into the in-memory source map."""
+
+        self.solidity_prepared = True
+        source_map.preload(Config.OPENZEPPELIN_PATH)
+        # any local solc will do for now; each file's pragma picks one later
+        if installed_solc_versions():
+            return
+        try:
+            installed = ensure_solc(SOLIDITY_VERSION)
+        except Exception as e:
+            self.call_from_thread(
+                self.notify, f"Solidity compiler unavailable: {e}", severity="error"
+            )
+            return
+        if installed:
+            self.call_from_thread(self.notify, f"Installed solc {SOLIDITY_VERSION}")
 
-    async def on_mount(self) -> None:
-        self.w3 = Web3(EthereumTesterProvider())
-        self.active_account = self.w3.eth.accounts[0]
+    @work(exclusive=True, thread=True, group="chain")
+    def start_chain(self) -> None:
+        """In the background, boot the local eth-tester chain, or connect to
+        SNEKO_RPC_URL.
+
+        web3 (and the py-evm stack behind it) is the slowest import in sneko,
+        so it stays off the startup path.
+        """
+
+        from sneko.chainstate import connect_web3
+
+        try:
+            w3, chain_store = connect_web3(Config.CHAIN_DB, Config.RPC_URL)
+        except ConnectionError as e:
+            self.call_from_thread(self.notify, str(e), severity="error")
+            return
+        self.call_from_thread(self.on_chain_ready, w3, chain_store)
+
+    async def on_chain_ready(self, w3, chain_store) -> None:
+        self.w3 = w3
+        self.chain_store = chain_store
+        self.deployments = DeploymentRegistry()
+        self.snapshots = []
+        self.balance_cache = BalanceCache()
+        self.event_log = EventLog(Config.EVENTS_BLOCK_RANGE)
+        self.accounts = list(w3.eth.accounts)
+        self.active_account = self.accounts[0]
         await self.update_account_balances()
+
+        if chain_store is not None:
+            for (
+                address,
+                name,
+                abi,
+                block_number,
+                gas_used,
+            ) in chain_store.load_deployments():
+                deployment = self.deployments.add(
+                    w3,
+                    name,
+                    ContractAbi.from_json(abi),
+                    address,
+                    block_number,
+                    gas_used,
+                )
+                # nothing polled yet, so this only registers the decoder
+                self.event_log.track(w3, deployment)
+            if len(self.deployments):
+                self.refresh_instance_select()
+                self.query_one("#instance-select", Select).value = list(
+                    self.deployments
+                )[-1].address
+                self.notify(
+                    f"Restored {len(self.deployments)} deployment(s) "
+                    f"from {chain_store.path}"
+                )
+
+    def save_chain(self) -> None:
+        """Write chain state and deployments to SNEKO_CHAIN_DB, if set."""
+
+        if self.chain_store is not None:
+            self.chain_store.save(self.deployments)
+
+    def on_unmount(self) -> None:
+        if self.chain_store is not None:
+            self.save_chain()
+            self.chain_store.close()
+
+    async def on_mount(self) -> None:
         self.query_one(DirectoryTree).focus()
+        self.metrics = MetricsLog()
+        self.query_one("#metrics-table", DataTable).add_columns(*AGGREGATE_FIELDS)
+        self.query_one("#events-table", DataTable).add_columns(
+            "block", "contract", "event", "args", "tx"
+        )
+        self.query_one("#profile-lines", DataTable).add_columns(
+            "line", "gas", "share", "source"
+        )
+        self.query_one("#profile-opcodes", DataTable).add_columns(
+            "opcode", "count", "gas"
+        )
+        self.query_one("#benchmark-table", DataTable).add_columns(
+            "function",
+            "samples",
+            "errors",
+            "gas_min",
+            "gas_median",
+            "gas_max",
+            "latency_ms_median",
+            "gas_median_change",
+        )
+        self.ui_ready_at = time.perf_counter()
+        self.start_chain()
+        self.build_import_graph()
+        self.set_interval(Config.IMPORT_POLL_INTERVAL, self.poll_import_graph)
+        self.set_interval(Config.VIEWS_POLL_INTERVAL, self.refresh_views)
+        self.set_interval(Config.EVENTS_POLL_INTERVAL, self.poll_events)
         self.load_syntax_highlighting()
 
+    def account_label(self, account: str) -> str:
+        balance = self.balance_cache.balances[account]
+        return f"{account} ({self.w3.from_wei(balance, 'ether')} ETH)"
+
     async def update_account_balances(self) -> None:
-        w3 = self.w3
-        accounts = w3.eth.accounts
-        options = [
-            (f"{a} ({w3.from_wei(w3.eth.get_balance(a), 'ether')} ETH)", a)
-            for a in accounts
-        ]
+        """Refresh the account picker if any balance changed."""
+
+        changed = await asyncio.to_thread(
+            self.balance_cache.refresh, self.w3, self.accounts
+        )
+        if not changed:
+            return
+
         sel = self.query_one("#acct-select", Select)
-        sel.set_options(options)
-        sel.value = self.active_account
-
-    async def handle_compile_error(self, e) -> None:
-        if "vyper: command not found" in str(e):
-            error_msg = f"{BOLD}A local installation of Vyper is required to compile Vyper contracts.{RESET}\n"
-            error_msg += f"\n{str(e)}"
-            self.notify(error_msg, severity="error", timeout=100)
-        else:
+        # relabelling means rebuilding the options, which clears the selection
+        active_account = self.active_account
+        sel.set_options((self.account_label(a), a) for a in self.accounts)
+        sel.value = active_account
+
+    async def handle_compile_error(self, contract_path, e, automatic=False) -> None:
+        if contract_path != self.contract_path:
+            return
+        self.query_one("#compile-button", Button).loading = False
+        self.query_one("#compile-diagnostics", Static).update(str(e))
+
+        # watch mode reports errors inline only; a typo shouldn't spam
+        # notifications or reset the deploy controls
+        if not automatic:
             self.notify(str(e), severity="error", timeout=100)
+            await self.nuke_playground()
+
         self.query_one("#abi-view", Input).value = "oop!"
         self.query_one("#bytecode-view", Input).value = "oop!"
 
@@ -235,20 +532,79 @@ class Sneko(App):
         generate_script_button.disabled = True
         generate_ape_button = self.query_one("#generate-ape-button", Button)
         generate_ape_button.disabled = True
-
-        await self.nuke_playground()
+        compare_button = self.query_one("#compare-button", Button)
+        compare_button.disabled = True
 
         self.abi = None
         self.bytecode = None
+        self.artifacts = {}
+        self.abis = {}
+        self.compiled_source = None
+        self.artifact_name = None
+        self.contract_abi = None
+
+    async def handle_compile_success(
+        self, contract_path, code, contracts, abis, automatic=False
+    ):
+        # the user moved on to another file while this one was compiling
+        if contract_path != self.contract_path:
+            return
+        self.query_one("#compile-button", Button).loading = False
+        self.query_one("#compile-diagnostics", Static).update("")
+
+        # watch mode recompiles keep whichever contract was picked
+        previous = self.artifact_name
+        self.artifacts = contracts
+        self.abis = abis
+        self.compiled_source = code
+        self.artifact_name = None
+        name = (
+            previous
+            if automatic and previous in contracts
+            else self.default_artifact_name(contract_path, contracts)
+        )
 
-    def get_constructor_args(self, abi):
-        for abi_value in json.loads(abi) if type(abi) == str else abi:
-            if abi_value["type"] == "constructor":
-                return ", ".join(
-                    [f"{arg['type']} {arg['name']}" for arg in abi_value["inputs"]]
-                )
+        contract_select = self.query_one("#contract-select", Select)
+        contract_select.set_options([(n, n) for n in contracts])
+        contract_select.disabled = len(contracts) < 2
+        if name is not None:
+            contract_select.value = name
+            self.show_artifact(name)
+        else:
+            # nothing was defined, so the last contract can't be deployed
+            self.clear_artifact()
+            await self.nuke_playground()
+
+        if not automatic:
+            self.query_one("#constructor-args", Input).value = ""
+
+    def default_artifact_name(self, contract_path, contracts):
+        """Pick the contract a file is most likely about.
+
+        Prefers the deployable contract named after the file, then any
+        deployable contract, then whatever was defined.
+        """
+
+        deployable = [name for name, c in contracts.items() if c["bin"]]
+        if Path(contract_path).stem in deployable:
+            return Path(contract_path).stem
+        if deployable:
+            return deployable[-1]
+        return next(iter(contracts), None)
+
+    def show_artifact(self, name: str) -> None:
+        """Load one compiled contract's ABI and bytecode, without recompiling."""
+
+        if name == self.artifact_name:
+            return
+        self.artifact_name = name
+        contract_interface = self.artifacts[name]
+        self.contract_abi = self.abis[name]
+
+        self.constructor_args = self.contract_abi.constructor_placeholder
+        self.abi = self.contract_abi.json
+        self.bytecode = json.dumps(contract_interface["bin"])
 
-    async def handle_compile_success(self):
         abi_value = self.abi
         bytecode_value = self.bytecode
 
@@ -268,66 +624,94 @@ class Sneko(App):
         generate_ape_button = self.query_one("#generate-ape-button", Button)
         generate_ape_button.disabled = False
 
+        # abstract contracts and interfaces have no bytecode to deploy
         deploy_button = self.query_one("#deploy-button", Button)
-        deploy_button.disabled = False
+        deploy_button.disabled = not contract_interface["bin"]
+        compare_button = self.query_one("#compare-button", Button)
+        compare_button.disabled = not contract_interface["bin"]
 
-        self.query_one("#constructor-args", Input).value = ""
+    @on(Select.Changed, "#contract-select")
+    def contract_select_changed(self, event: Select.Changed) -> None:
+        if event.value in self.artifacts:
+            self.show_artifact(event.value)
 
-    async def compile_contract(self) -> None:
-        self.contract = None
-        code_view = self.query_one("#code-view", TextArea)
-        code = code_view.text
+    def compile_contract(self, automatic=False) -> None:
+        """Compile the editor buffer in the background.
+
+        Automatic (watch mode) compiles are skipped when the buffer is
+        unchanged since the last compile.
+        """
 
-        file_extension = Path(self.sub_title).suffix
+        code = self.query_one("#code-view", TextArea).text
+        code_hash = hashlib.sha256(code.encode("utf8")).hexdigest()
+        if automatic and code_hash == self.compiled_hash:
+            return
+        self.compiled_hash = code_hash
+
+        self.query_one("#compile-button", Button).loading = True
+        self.run_compile(self.contract_path, code, automatic)
+
+    @work(exclusive=True, thread=True, group="compile")
+    def run_compile(self, contract_path, code: str, automatic=False) -> None:
+        """In the background, compile `code`, the buffer of `contract_path`.
+
+        Starting another compile cancels this one; a cancelled compile runs
+        to completion but its result is dropped.
+        """
+
+        worker = get_current_worker()
+        file_extension = Path(contract_path).suffix
 
         try:
             # SOLIDITY:
-            current_dir = os.path.dirname(__file__)
-            file_path = os.path.join(
-                current_dir, "contracts", "solidity", "OpenZeppelin", "v5.0.2"
-            )
             if file_extension == ".sol":
-                compiled_sol = solcx.compile_source(
-                    code,
-                    output_values=["abi", "bin", "bin-runtime"],
-                    import_remappings=[f"@openzeppelin/contracts={file_path}"],
-                )
-                # Main contract has key: "<stdin>:<contract_name>"
-                contract_key = next(
-                    (key for key in compiled_sol if key.startswith("<stdin>:")), None
-                )
-                contract_interface = compiled_sol[contract_key]
-                self.constructor_args = self.get_constructor_args(
-                    json.dumps(contract_interface["abi"])
+                source_name = source_unit_name(contract_path, self.contracts_root)
+                compiled_sol = compile_solidity(
+                    code, str(self.contracts_root), source_name
                 )
-                self.abi = json.dumps(contract_interface["abi"])
-                self.bytecode = json.dumps(contract_interface["bin"])
+                # Contracts in the file have keys "<source_name>:<contract_name>"
+                contracts = {
+                    key[len(source_name) + 1 :]: contract_interface
+                    for key, contract_interface in compiled_sol.items()
+                }
             # VYPER:
             elif file_extension == ".vy":
-                contract_path = Path(self.contract_path)
-                contract = subprocess.run(
-                    ["vyper", contract_path.resolve(), "-f", "abi,bytecode"],
-                    capture_output=True,
-                    text=True,
-                )
-                if contract.stderr:
-                    await self.handle_compile_error(contract.stderr)
-                    return
-                else:
-                    contract_artifacts = contract.stdout.split("\n")
-                    self.constructor_args = self.get_constructor_args(
-                        contract_artifacts[0]
-                    )
-                    self.abi = contract_artifacts[0]
-                    self.bytecode = f'"{contract_artifacts[1]}"'
+                contracts = {Path(contract_path).stem: compile_vyper(contract_path)}
             # WAT?
             else:
                 raise Exception("Unsupported file extension")
+            abis = {name: ContractAbi(c["abi"]) for name, c in contracts.items()}
         except Exception as e:
-            await self.handle_compile_error(e)
+            if not worker.is_cancelled:
+                self.call_from_thread(
+                    self.handle_compile_error, contract_path, e, automatic
+                )
+            return
+
+        if not worker.is_cancelled:
+            self.call_from_thread(
+                self.handle_compile_success,
+                contract_path,
+                code,
+                contracts,
+                abis,
+                automatic,
+            )
+
+    @on(TextArea.Changed, "#code-view")
+    def code_changed(self, event: TextArea.Changed) -> None:
+        """In watch mode, recompile once the editor has been idle a moment."""
+
+        if not self.watch_mode:
+            return
+        if self.query_one("#compile-button", Button).disabled:
             return
 
-        await self.handle_compile_success()
+        if self.watch_timer is not None:
+            self.watch_timer.stop()
+        self.watch_timer = self.set_timer(
+            Config.WATCH_DEBOUNCE, lambda: self.compile_contract(automatic=True)
+        )
 
     def generate_script(self) -> None:
         """Generate a Python script to deploy the contract."""
@@ -353,140 +737,390 @@ class Sneko(App):
         address_display.update("")
 
     async def nuke_playground(self) -> None:
-        """Unmount deployed contract buttons and inputs."""
+        """Reset the deploy controls; deployed instances remain usable."""
 
-        await self.clear_deployed_contract()
         deploy_button = self.query_one("#deploy-button", Button)
         deploy_button.disabled = True
         constructor_args = self.query_one("#constructor-args", Input)
         constructor_args.value = ""
 
-    def convert_string_to_typed_data(self, values, input_types):
-        """Given a comma separated string of values, convert to typed data."""
-
-        values_list = [a.strip() for a in values.split(",")]
-        typed_values = values_list.copy()
-
-        for i, arg in enumerate(values_list):
-            if "int" in input_types[i]["type"]:
-                typed_values[i] = int(arg)
-            # TODO: handle remaining types
-
-        return typed_values
-
     async def update_contract_balance(self, address: str) -> None:
         """Update the contract balance."""
 
-        balance_wei = self.w3.eth.get_balance(address)
+        balance_wei = await asyncio.to_thread(self.w3.eth.get_balance, address)
         balance_ether = self.w3.from_wei(balance_wei, "ether")
 
         self.query_one("#contract-balance", Static).update(
             f"Contract balance: {balance_ether} ETH"
         )
 
-    @on(Select.Changed)
+    @on(Select.Changed, "#acct-select")
     def select_changed(self, event: Select.Changed) -> None:
-        self.active_account = event.value
+        # set_options blanks the selection before it's restored
+        if event.value != Select.BLANK:
+            self.active_account = event.value
 
     async def deploy_contract(self) -> None:
         """Deploy the contract to the Ethereum network."""
 
-        if not self.abi or not self.bytecode:
-            await self.compile_contract()
+        if self.w3 is None:
+            self.notify("Local chain is still starting, try again in a moment")
+            return
+
+        if self.artifact_name is None or not self.abi or not self.bytecode:
+            self.notify("Compile the contract first", severity="warning")
+            return
 
-        await self.clear_deployed_contract()
+        constructor_arg_input = self.query_one("#constructor-args", Input).value
+
+        # kept with the instance, since the editor may move on before its
+        # functions are profiled
+        source = {
+            "source_path": self.contract_path,
+            "source": self.compiled_source,
+            "pc_lines": self.artifacts[self.artifact_name].get("pc-lines"),
+        }
+        self.query_one("#deploy-button", Button).loading = True
+        self.run_deploy(
+            self.artifact_name,
+            self.contract_abi,
+            self.artifacts[self.artifact_name]["bin"],
+            constructor_arg_input,
+            self.active_account,
+            source,
+        )
+
+    @work(thread=True, group="deploy")
+    def run_deploy(
+        self, name, contract_abi, bytecode, constructor_arg_input, account, source
+    ) -> None:
+        """In the background, send the deploy transaction and await its receipt."""
 
         w3 = self.w3
-        bytecode = self.query_one("#bytecode-view", Input).value
-        abi = self.query_one("#abi-view", Input).value
-        bytecode = json.loads(bytecode)
-        abi = json.loads(abi)
 
         try:
-            contract = w3.eth.contract(abi=abi, bytecode=bytecode)
+            contract = w3.eth.contract(abi=contract_abi.raw, bytecode=bytecode)
 
-            constructor_types = None
-            for abi_value in contract.abi:
-                if abi_value["type"] == "constructor":
-                    constructor_types = abi_value["inputs"]
-            constructor_arg_input = self.query_one("#constructor-args", Input).value
-
-            tx_body = {"from": self.active_account}
+            tx_body = {"from": account}
             if constructor_arg_input == "":
-                tx_hash = contract.constructor().transact(tx_body)
+                constructor = contract.constructor()
             else:
-                typed_args = self.convert_string_to_typed_data(
-                    constructor_arg_input, constructor_types
+                typed_args = contract_abi.constructor.convert_args(
+                    constructor_arg_input
                 )
-                tx_hash = contract.constructor(*typed_args).transact(tx_body)
-            self.notify(f"Transaction hash: {tx_hash.hex()}")
-            tx_receipt = w3.eth.wait_for_transaction_receipt(tx_hash)
-            self.notify(f"Contract address: {tx_receipt.contractAddress}")
-
-            address_display = self.query_one("#deploy-address", Static)
-            address_display.update(f"Contract address: {tx_receipt.contractAddress}")
+                constructor = contract.constructor(*typed_args)
+            # not in the middle of a benchmark or comparison sample
+            with w3.provider.lock:
+                started = time.perf_counter()
+                tx_hash = constructor.transact(tx_body)
+                tx_receipt = w3.eth.wait_for_transaction_receipt(tx_hash)
+                latency_ms = (time.perf_counter() - started) * 1000
+            # outside the lock: this waits on the UI thread, which may itself
+            # be waiting to make a request
+            self.call_from_thread(self.notify, f"Transaction hash: {tx_hash.hex()}")
         except Exception as e:
-            self.notify(f"Error deploying contract: {e}", severity="error")
+            self.call_from_thread(self.handle_deploy_error, e)
             return
 
-        try:
-            deployed_contract = w3.eth.contract(
-                address=tx_receipt.contractAddress, abi=abi
-            )
+        self.metrics.record(
+            name,
+            "(deploy)",
+            "deploy",
+            tx_receipt.gasUsed,
+            latency_ms,
+            len(w3.eth.get_transaction(tx_hash)["input"]),
+            bytecode_bytes=len(bytes.fromhex(bytecode.removeprefix("0x"))),
+            runtime_bytes=len(w3.eth.get_code(tx_receipt.contractAddress)),
+        )
+        self.call_from_thread(self.show_metrics)
+
+        # even if the user moved on, the contract now exists on chain
+        self.call_from_thread(
+            self.handle_deploy_success, name, contract_abi, tx_receipt, source
+        )
 
+    def handle_deploy_error(self, e) -> None:
+        self.query_one("#deploy-button", Button).loading = False
+        self.notify(f"Error deploying contract: {e}", severity="error")
+
+    async def handle_deploy_success(
+        self, name, contract_abi, tx_receipt, source
+    ) -> None:
+        self.query_one("#deploy-button", Button).loading = False
+        self.notify(f"Contract address: {tx_receipt.contractAddress}")
+
+        deployment = self.deployments.add(
+            self.w3,
+            name,
+            contract_abi,
+            tx_receipt.contractAddress,
+            tx_receipt.blockNumber,
+            tx_receipt.gasUsed,
+            **source,
+        )
+        self.save_chain()
+        await self.take_snapshot(f"deployed {deployment.label}")
+        # constructor events may predate the event log's cursor
+        if await asyncio.to_thread(self.event_log.track, self.w3, deployment):
+            self.show_events()
+        self.query_one("#constructor-args", Input).value = ""
+        self.refresh_instance_select()
+        # switching instances is handled by instance_select_changed
+        self.query_one("#instance-select", Select).value = deployment.address
+
+    def refresh_instance_select(self) -> None:
+        sel = self.query_one("#instance-select", Select)
+        sel.set_options((d.label, d.address) for d in self.deployments)
+
+    def snapshot_chain(self) -> tuple:
+        """Snapshot the chain; blocks. Returns (snapshot id, block number)."""
+
+        # not in the middle of a benchmark or comparison sample
+        with self.w3.provider.lock:
+            return self.w3.testing.snapshot(), self.w3.eth.block_number
+
+    def revert_chain(self, snapshot_id):
+        """Revert to a snapshot, returning a fresh id for it; blocks."""
+
+        with self.w3.provider.lock:
+            self.w3.testing.revert(snapshot_id)
+            # nodes like anvil discard a snapshot once it's reverted to
+            return self.w3.testing.snapshot()
+
+    async def take_snapshot(self, label: str) -> int:
+        """Record the current chain state so it can be reverted to later.
+
+        Returns the snapshot's block number.
+        """
+
+        snapshot_id, block_number = await asyncio.to_thread(self.snapshot_chain)
+        self.snapshots.append((snapshot_id, block_number, label))
+        return block_number
+
+    async def action_snapshot(self) -> None:
+        if self.w3 is None:
+            self.notify("Local chain is still starting, try again in a moment")
+            return
+        block_number = await self.take_snapshot("manual snapshot")
+        self.notify(f"Snapshot taken at block {block_number}")
+
+    async def action_revert(self) -> None:
+        """Revert the chain to the latest snapshot.
+
+        If nothing has happened since that snapshot, step back to the one
+        before it instead, so repeated presses walk back through history.
+        """
+
+        if self.w3 is None or not self.snapshots:
+            self.notify("No snapshot to revert to", severity="warning")
+            return
+
+        current = await asyncio.to_thread(lambda: self.w3.eth.block_number)
+        while len(self.snapshots) > 1 and current == self.snapshots[-1][1]:
+            self.snapshots.pop()
+        snapshot_id, block_number, label = self.snapshots[-1]
+        snapshot_id = await asyncio.to_thread(self.revert_chain, snapshot_id)
+        self.snapshots[-1] = (snapshot_id, block_number, label)
+        self.balance_cache.invalidate()
+        if self.views is not None:
+            self.views.invalidate()
+        self.event_log.rewind(block_number)
+        self.show_events()
+
+        # instances deployed after the snapshot no longer exist
+        pruned = self.deployments.prune(block_number)
+        if pruned:
+            self.refresh_instance_select()
+        if self.last_call and self.deployments.get(self.last_call[0]) is None:
+            self.last_call = None
+        active = self.deployments.get(self.contract.address if self.contract else None)
+        if active is None and len(self.deployments):
+            active = list(self.deployments)[-1]
+        if active is not None:
+            self.query_one("#instance-select", Select).value = active.address
+            await self.update_contract_balance(active.address)
+        else:
+            self.contract = None
+            self.deployed_abi = None
+            self.views = None
+            await self.clear_deployed_contract()
+            self.query_one("#contract-balance", Static).update("")
+        await asyncio.gather(self.update_account_balances(), self.refresh_views())
+        self.save_chain()
+        self.notify(f"Reverted to {label} (block {block_number})")
+
+    @on(Select.Changed, "#instance-select")
+    async def instance_select_changed(self, event: Select.Changed) -> None:
+        if event.value is Select.BLANK:
+            return
+        await self.show_deployment(self.deployments.get(event.value))
+
+    async def show_deployment(self, deployment) -> None:
+        """Make `deployment` the playground's active contract instance."""
+
+        await self.clear_deployed_contract()
+        self.query_one("#deploy-address", Static).update(deployment.summary)
+
+        try:
             playground = self.query_one("#playground-fn-body", Static)
-            fns = deployed_contract.all_functions()
-            for fn in fns:
-                is_tx = fn.abi["stateMutability"] in ["nonpayable", "payable"]
-                is_payable = fn.abi["stateMutability"] == "payable"
-                b = Button(
-                    fn.fn_name,
-                    id=f"fn-button-{fn.fn_name}",
-                    classes="fn-button",
-                    variant="warning" if is_tx else "primary",
-                )
-                fn_inputs = fn.abi["inputs"]
-                if fn_inputs:
-                    placeholder = ", ".join(
-                        [f"{arg['type']} {arg['name']}" for arg in fn_inputs]
-                    )
-                    i = Input(
-                        placeholder=f"{placeholder}",
-                        id=f"fn-input-{fn.fn_name}",
-                        classes="fn-input",
+            # one entry per name: web3 can't pick between overloads by name
+            functions = list(deployment.abi.by_name.values())
+            self.fn_filter = ""
+            self.unrendered_fns = {
+                "read": [fn for fn in functions if not fn.is_tx],
+                "write": [fn for fn in functions if fn.is_tx],
+            }
+            # entries are only mounted once their section is expanded
+            collapsed = len(functions) > Config.FN_EXPANDED_LIMIT
+            self.views = ViewDashboard(deployment)
+            views_section = []
+            if self.views.functions:
+                views_section.append(
+                    Collapsible(
+                        DataTable(id="views-table"),
+                        title=f"State ({len(self.views.functions)})",
+                        id="views-section",
+                        classes="fn-section",
                     )
-                    h = Horizontal(
-                        b, i, id=f"fn-group-{fn.fn_name}", classes="fn-group"
-                    )
-                else:
-                    h = Horizontal(b, id=f"fn-group-{fn.fn_name}", classes="fn-group")
-                playground.mount(h)
-                if is_payable:
-                    playground.mount(
-                        Horizontal(
-                            Static("↳", classes="fn-value-label"),
-                            Input(
-                                placeholder="payable: value in wei",
-                                id=f"fn-value-{fn.fn_name}",
-                                classes="fn-value",
-                            ),
-                            classes="fn-value-grouping",
+                )
+            await playground.mount_all(
+                [
+                    Input(placeholder="Filter functions", id="fn-filter"),
+                    *views_section,
+                    *(
+                        Collapsible(
+                            title=f"{kind.title()} ({len(fns)})",
+                            collapsed=collapsed,
+                            id=f"fn-section-{kind}",
+                            classes="fn-section",
                         )
-                    )
-                self.contract = deployed_contract
-            self.query_one("#constructor-args", Input).value = ""
-            await self.update_contract_balance(tx_receipt.contractAddress)
-            await self.update_account_balances()
+                        for kind, fns in self.unrendered_fns.items()
+                        if fns
+                    ),
+                ]
+            )
+            self.contract = deployment.contract
+            self.deployed_abi = deployment.abi
+            if views_section:
+                self.query_one("#views-table", DataTable).add_columns(
+                    "function", "value"
+                )
+            await asyncio.gather(
+                self.update_contract_balance(deployment.address),
+                self.update_account_balances(),
+                self.refresh_views(),
+            )
         except Exception as e:
             self.notify(f"Error generating UI: {e}", severity="error")
 
+    async def refresh_views(self) -> None:
+        """Redraw the state dashboard if a block was mined since it was read."""
+
+        views = self.views
+        if views is None or not views.functions:
+            return
+        if not await asyncio.to_thread(views.refresh, self.w3):
+            return
+        if views is not self.views:
+            return  # another instance was selected meanwhile
+        try:
+            table = self.query_one("#views-table", DataTable)
+        except NoMatches:
+            return
+        table.clear()
+        for fn in views.functions:
+            table.add_row(fn.signature, format_view_value(views.values[fn.signature]))
+        self.query_one("#views-section", Collapsible).title = (
+            f"State ({len(views.functions)}) @ block {views.block_number}"
+        )
+
+    def build_fn_entry(self, fn) -> Vertical:
+        """The button, input and payable value row for one contract function."""
+
+        b = Button(
+            fn.name,
+            id=f"fn-button-{fn.name}",
+            classes="fn-button",
+            variant="warning" if fn.is_tx else "primary",
+        )
+        if fn.inputs:
+            i = Input(
+                placeholder=fn.placeholder,
+                id=f"fn-input-{fn.name}",
+                classes="fn-input",
+            )
+            rows = [Horizontal(b, i, id=f"fn-group-{fn.name}", classes="fn-group")]
+        else:
+            rows = [Horizontal(b, id=f"fn-group-{fn.name}", classes="fn-group")]
+        if fn.is_payable:
+            rows.append(
+                Horizontal(
+                    Static("↳", classes="fn-value-label"),
+                    Input(
+                        placeholder="payable: value in wei",
+                        id=f"fn-value-{fn.name}",
+                        classes="fn-value",
+                    ),
+                    classes="fn-value-grouping",
+                )
+            )
+        entry = Vertical(*rows, name=fn.name, classes="fn-entry")
+        entry.display = self.fn_filter in fn.name.lower()
+        return entry
+
+    @on(Collapsible.Expanded, ".fn-section")
+    def fn_section_expanded(self, event: Collapsible.Expanded) -> None:
+        self.render_fn_section(event.collapsible.id.removeprefix("fn-section-"))
+
+    def render_fn_section(self, kind: str) -> None:
+        """Mount a section's function entries, one batch per screen refresh.
+
+        The first batch is drawn straight away and the rest follow, so even
+        contracts with dozens of functions never stall the UI on deploy.
+        """
+
+        pending = self.unrendered_fns.get(kind)
+        if not pending:
+            return
+        try:
+            section = self.query_one(f"#fn-section-{kind}", Collapsible)
+        except NoMatches:
+            return  # the playground was cleared in the meantime
+
+        batch = pending[: Config.FN_RENDER_BATCH]
+        del pending[: Config.FN_RENDER_BATCH]
+        section.query_one(Collapsible.Contents).mount_all(
+            [self.build_fn_entry(fn) for fn in batch]
+        )
+        if pending:
+            self.call_after_refresh(self.render_fn_section, kind)
+
+    @on(Input.Changed, "#fn-filter")
+    def filter_functions(self, event: Input.Changed) -> None:
+        """Show only the functions whose name contains the filter text."""
+
+        self.fn_filter = event.value.strip().lower()
+        for entry in self.query(".fn-entry"):
+            entry.display = self.fn_filter in entry.name.lower()
+        if not self.fn_filter:
+            return
+        # expanding a section mounts its entries, so matches show up there too
+        for kind, pending in self.unrendered_fns.items():
+            if any(self.fn_filter in fn.name.lower() for fn in pending):
+                self.query_one(f"#fn-section-{kind}", Collapsible).collapsed = False
+
     def get_contract_fn_abi(self, name):
-        """Given a fn name, return the relevant ABI info"""
+        """Given a fn name, return the relevant parsed ABI entry"""
+
+        return self.deployed_abi.by_name.get(name)
+
+    def send_transaction(self, fn_call, tx_body) -> tuple:
+        """Send a transaction and wait for it to be mined; blocks."""
 
-        for declaration in self.contract.abi:
-            if declaration.get("name") == name:
-                return declaration
-        return None
+        # not in the middle of a benchmark or comparison sample
+        with self.w3.provider.lock:
+            tx_hash = fn_call.transact(tx_body)
+            return tx_hash, self.w3.eth.wait_for_transaction_receipt(tx_hash)
 
     async def handle_contract_fn_button(self, button_id: str) -> None:
         """Handle a button click for a contract function."""
@@ -495,8 +1129,12 @@ class Sneko(App):
 
         # determine if call or transact:
         fn_abi = self.get_contract_fn_abi(button_id)
-        is_tx = fn_abi["stateMutability"] in ["nonpayable", "payable"]
-        is_payable = fn_abi["stateMutability"] == "payable"
+        # the active instance may change, or be reverted away, while the
+        # call is in flight
+        contract = self.contract
+        contract_name = self.deployments.get(contract.address).name
+        is_tx = fn_abi.is_tx
+        is_payable = fn_abi.is_payable
 
         try:
             input_value = self.query_one(f"#fn-input-{button_id}").value
@@ -508,51 +1146,410 @@ class Sneko(App):
         except:
             value = None
 
-        if input_value:
-            try:
-                converted_input = self.convert_string_to_typed_data(
-                    input_value, fn_abi["inputs"]
+        try:
+            converted_input = fn_abi.convert_args(input_value) if input_value else []
+            fn_call = contract.functions[button_id](*converted_input)
+            calldata = contract.encode_abi(button_id, args=converted_input)
+            # what the Profile tab replays: the mined transaction if there is
+            # one, otherwise the call simulated on the latest block
+            transaction = {
+                "from": self.active_account,
+                "to": contract.address,
+                "data": calldata,
+                "value": 0,
+            }
+            self.last_call = (contract.address, None, transaction)
+            if is_tx:
+                tx_body = {
+                    "value": parse_wei(value) if is_payable else 0,
+                    "from": self.active_account,
+                }
+                transaction["value"] = tx_body["value"]
+                (tx_hash, tx_receipt), latency_ms = await asyncio.to_thread(
+                    timed, self.send_transaction, fn_call, tx_body
                 )
-                if is_tx:
-                    tx_body = {
-                        "value": int(value) if is_payable else 0,
-                        "from": self.active_account,
-                    }
-                    tx_hash = self.contract.functions[button_id](
-                        *converted_input
-                    ).transact(tx_body)
-                    self.notify(f"Tx hash: {tx_hash.hex()}")
-                    await self.update_contract_balance(self.contract.address)
-                    await self.update_account_balances()
-                else:
-                    response = self.contract.functions[button_id](
-                        *converted_input
-                    ).call()
-                    self.notify(f"Function response: {response}")
-            except Exception as e:
-                self.notify(f"Error calling function: {e}", severity="error")
+                self.last_call = (contract.address, tx_hash, None)
+                gas_used = tx_receipt.gasUsed
+                events = len(tx_receipt.logs)
+                self.notify(
+                    f"Tx hash: {tx_hash.hex()} ({gas_used:,} gas, "
+                    f"{events} event{'' if events == 1 else 's'})"
+                )
+                self.save_chain()
+                await asyncio.gather(
+                    self.update_contract_balance(contract.address),
+                    self.update_account_balances(),
+                    self.refresh_views(),
+                    self.poll_events(),
+                )
+            else:
+                call_body = {"from": self.active_account}
+                response, latency_ms = await asyncio.to_thread(
+                    timed, fn_call.call, call_body
+                )
+                # a call isn't mined, so there's no gas used to record (node
+                # estimates are too coarse to stand in); Benchmark measures it
+                gas_used = None
+                self.notify(f"Function response: {response}")
+        except Exception as e:
+            self.notify(f"Error calling function: {e}", severity="error")
+            return
+
+        self.metrics.record(
+            contract_name,
+            button_id,
+            "transact" if is_tx else "call",
+            gas_used,
+            latency_ms,
+            len(calldata) // 2 - 1,
+        )
+        self.show_metrics()
+
+    async def poll_events(self) -> None:
+        """Stream events mined since the last poll into the Events tab."""
+
+        if self.event_log is None:
+            return
+        events = await asyncio.to_thread(self.event_log.poll, self.w3)
+        # a poll that found the chain changed has dropped events too
+        if events or self.event_log.index.version != self.events_version:
+            self.show_events(events)
+
+    def show_events(self, new_events=None) -> None:
+        """Append `new_events` to the events table, or redraw it.
+
+        Appending is only possible while the table shows the unfiltered tail
+        of the index; a filter, a revert or a backfill redraws it.
+        """
+
+        table = self.query_one("#events-table", DataTable)
+        query = self.query_one("#events-filter", Input).value
+        index = self.event_log.index
+        if (
+            new_events
+            and not query.strip()
+            and self.events_version == index.version
+            and table.row_count + len(new_events) <= Config.EVENTS_TABLE_LIMIT
+        ):
+            rows = new_events
         else:
-            try:
-                if is_tx:
-                    tx_body = {
-                        "value": int(value) if is_payable else 0,
-                        "from": self.active_account,
-                    }
-                    tx_hash = self.contract.functions[button_id]().transact(tx_body)
-                    self.notify(f"Tx hash: {tx_hash.hex()}")
-                    await self.update_contract_balance(self.contract.address)
-                    await self.update_account_balances()
+            table.clear()
+            rows = index.query(query)[-Config.EVENTS_TABLE_LIMIT :]
+            self.events_version = index.version
+        for event in rows:
+            table.add_row(
+                event.block_number,
+                event.contract,
+                event.name,
+                event.summary,
+                event.tx_hash,
+            )
+        table.scroll_end(animate=False)
+
+    @on(Input.Changed, "#events-filter")
+    def filter_events(self, event: Input.Changed) -> None:
+        if self.event_log is not None:
+            self.show_events()
+
+    def start_profile(self) -> None:
+        """Trace the last contract function called and show where its gas went."""
+
+        deployment = self.last_call and self.deployments.get(self.last_call[0])
+        if deployment is None:
+            self.notify("Call a contract function first", severity="warning")
+            return
+
+        _, tx_hash, transaction = self.last_call
+        self.query_one("#profile-button", Button).loading = True
+        self.run_profile(deployment, tx_hash, transaction)
+
+    @work(exclusive=True, thread=True, group="profile")
+    def run_profile(self, deployment, tx_hash, transaction) -> None:
+        """In the background, trace the call and total its gas."""
+
+        try:
+            steps = trace(self.w3, tx_hash, transaction)
+        except Exception as e:
+            self.call_from_thread(self.handle_profile_error, e)
+            return
+        lines = None
+        if deployment.pc_lines is not None:
+            lines = line_profile(steps, deployment.address, deployment.pc_lines)
+        self.call_from_thread(self.show_profile, deployment, steps, lines)
+
+    def handle_profile_error(self, e) -> None:
+        self.query_one("#profile-button", Button).loading = False
+        self.notify(f"Error profiling call: {e}", severity="error")
+
+    def show_profile(self, deployment, steps, lines) -> None:
+        self.query_one("#profile-button", Button).loading = False
+        self.profiled = deployment
+        total = sum(step.gas_cost for step in steps)
+        status = (
+            f"{deployment.name}: {len(steps):,} opcodes, {total:,} gas of execution"
+        )
+
+        table = self.query_one("#profile-lines", DataTable)
+        table.clear()
+        if lines is None:
+            status += " (no source map: deployed in an earlier session)"
+        else:
+            source_lines = (deployment.source or "").splitlines()
+            for line, gas in sorted(lines.items(), key=lambda row: -row[1]):
+                share = gas / total if total else 0
+                if line is None:
+                    text = "(dispatcher, or no source location)"
+                elif line <= len(source_lines):
+                    text = source_lines[line - 1].strip()
                 else:
-                    response = self.contract.functions[button_id]().call()
-                    self.notify(f"Function response: {response}")
-            except Exception as e:
-                self.notify(f"Error calling function: {e}", severity="error")
+                    text = ""
+                table.add_row(
+                    "-" if line is None else line,
+                    f"{gas:,}",
+                    f"{'█' * round(share * 20):<20} {share:.1%}",
+                    text,
+                    key=None if line is None else str(line),
+                )
+        self.query_one("#profile-status", Static).update(status)
+
+        table = self.query_one("#profile-opcodes", DataTable)
+        table.clear()
+        for op, count, gas in opcode_profile(steps):
+            table.add_row(op, f"{count:,}", f"{gas:,}")
+
+    @on(DataTable.RowSelected, "#profile-lines")
+    def profile_line_selected(self, event: DataTable.RowSelected) -> None:
+        """Jump to the selected line in the editor, if it holds the code the
+        profiled instance was deployed from."""
+
+        if event.row_key.value is None:
+            return
+        line = int(event.row_key.value)
+        code_view = self.query_one("#code-view", TextArea)
+        if (
+            self.contract_path != self.profiled.source_path
+            or code_view.text != self.profiled.source
+        ):
+            self.notify(
+                f"Line {line} is in {Path(self.profiled.source_path).name} as "
+                "deployed; the editor holds different code",
+                severity="warning",
+            )
+            return
+        code_view.move_cursor((line - 1, 0), center=True)
+
+    def show_metrics(self) -> None:
+        """Redraw the per-function gas and latency summary."""
+
+        table = self.query_one("#metrics-table", DataTable)
+        table.clear()
+        for row in self.metrics.aggregates():
+            table.add_row(*(format_metric(row[field]) for field in AGGREGATE_FIELDS))
+
+    def export_metrics(self, file_format: str) -> None:
+        path = f"sneko-metrics.{file_format}"
+        try:
+            if file_format == "csv":
+                self.metrics.export_csv(path)
+            else:
+                self.metrics.export_json(path)
+            self.notify(f"Metrics exported: saved to ./{path}")
+        except Exception as e:
+            self.notify(f"Error exporting metrics: {e}", severity="error")
+
+    def start_comparison(self) -> None:
+        """Compile the current contract under every optimizer configuration."""
+
+        if self.w3 is None:
+            self.notify("Local chain is still starting, try again in a moment")
+            return
+
+        contract_abi = self.contract_abi
+        try:
+            constructor_input = self.query_one("#constructor-args", Input).value
+            constructor = contract_abi.constructor
+            if constructor is None:
+                constructor_args = []
+            elif constructor_input:
+                constructor_args = constructor.convert_args(constructor_input)
+            else:
+                constructor_args = generate_arg_sets(constructor, self.accounts)[0]
+            plan = {
+                fn: generate_arg_sets(fn, self.accounts)[0]
+                for fn in contract_abi.functions
+            }
+        except Exception as e:
+            self.notify(f"Error preparing comparison: {e}", severity="error")
+            return
+
+        self.query_one("#compare-button", Button).loading = True
+        self.query_one("#compare-status", Static).update(
+            f"Compiling {self.artifact_name} under every configuration..."
+        )
+        self.query_one(TabbedContent).active = "compare-tab"
+        self.run_comparison(
+            self.contract_path,
+            self.query_one("#code-view", TextArea).text,
+            self.artifact_name,
+            constructor_args,
+            plan,
+            self.active_account,
+        )
+
+    @work(exclusive=True, thread=True, group="compare")
+    def run_comparison(
+        self, contract_path, code, name, constructor_args, plan, account
+    ) -> None:
+        """In the background, compile every variant, then deploy and measure each."""
+
+        rows = {}
+        try:
+            variants = compile_variants(contract_path, code, self.contracts_root)
+            for label, contracts in variants.items():
+                if isinstance(contracts, Exception):
+                    rows[label] = contracts
+                    continue
+                rows[label] = measure_variant(
+                    self.w3, contracts[name], constructor_args, plan, account
+                )
+        except Exception as e:
+            self.call_from_thread(self.handle_comparison_error, e)
+            return
+        self.call_from_thread(self.show_comparison, name, rows, plan)
+
+    def handle_comparison_error(self, e) -> None:
+        self.query_one("#compare-button", Button).loading = False
+        self.query_one("#compare-status", Static).update(f"Comparison failed: {e}")
+
+    def show_comparison(self, name, rows, plan) -> None:
+        self.query_one("#compare-button", Button).loading = False
+        table = self.query_one("#compare-table", DataTable)
+        table.clear(columns=True)
+        signatures = [fn.signature for fn in plan]
+        table.add_columns(
+            "configuration",
+            "bytecode_bytes",
+            "runtime_bytes",
+            "deploy_gas",
+            *(f"{signature} gas" for signature in signatures),
+        )
+        failures = []
+        for label, row in rows.items():
+            if isinstance(row, Exception):
+                failures.append(f"{label}: {row}")
+                table.add_row(label, *(["failed"] * (3 + len(signatures))))
+                continue
+            table.add_row(
+                label,
+                format_metric(row["bytecode_bytes"]),
+                format_metric(row["runtime_bytes"]),
+                format_metric(row["deploy_gas"]),
+                *(format_metric(row["call_gas"][s]) for s in signatures),
+            )
+        status = f"{name}: {len(rows) - len(failures)} of {len(rows)} configurations"
+        if failures:
+            status += "\n" + "\n".join(failures)
+        self.query_one("#compare-status", Static).update(status)
+
+    def start_benchmark(self) -> None:
+        """Benchmark the active instance's functions that match the filter.
+
+        Arguments typed into a function's input are used as-is; otherwise
+        small, medium and large argument sets are generated.
+        """
+
+        if self.contract is None:
+            self.notify("Deploy a contract first", severity="warning")
+            return
+
+        runs_input = self.query_one("#benchmark-runs", Input).value.strip()
+        try:
+            runs = int(runs_input) if runs_input else Config.BENCHMARK_RUNS
+        except ValueError:
+            self.notify("Runs must be a whole number", severity="error")
+            return
+
+        deployment = self.deployments.get(self.contract.address)
+        plan = {}
+        skipped = {}
+        try:
+            for fn in deployment.abi.functions:
+                if self.fn_filter not in fn.name.lower():
+                    continue
+                try:
+                    input_value = self.query_one(f"#fn-input-{fn.name}", Input).value
+                except NoMatches:
+                    input_value = ""
+                if input_value and deployment.abi.by_name[fn.name] is fn:
+                    plan[fn] = [fn.convert_args(input_value)]
+                    continue
+                try:
+                    plan[fn] = generate_arg_sets(fn, self.accounts)
+                except ValueError as e:
+                    # e.g. fixed-point inputs; the rest still get measured
+                    skipped[fn.signature] = str(e)
+        except Exception as e:
+            self.notify(f"Error preparing benchmark: {e}", severity="error")
+            return
+
+        self.query_one("#benchmark-button", Button).loading = True
+        self.run_benchmark(deployment, plan, runs, self.active_account, skipped)
+
+    @work(exclusive=True, thread=True, group="benchmark")
+    def run_benchmark(self, deployment, plan, runs, account, skipped) -> None:
+        """In the background, run the benchmark and save it next to the last run."""
+
+        try:
+            results = run_benchmark(self.w3, deployment, plan, runs, account, skipped)
+            path = benchmark_path(Config.BENCHMARK_PATH, deployment.name)
+            diff = diff_results(load_results(path), results)
+            save_results(results, path)
+        except Exception as e:
+            self.call_from_thread(self.handle_benchmark_error, e)
+            return
+        self.call_from_thread(self.show_benchmark, results, diff, path)
+
+    def handle_benchmark_error(self, e) -> None:
+        self.query_one("#benchmark-button", Button).loading = False
+        self.notify(f"Error running benchmark: {e}", severity="error")
+
+    def show_benchmark(self, results, diff, path) -> None:
+        self.query_one("#benchmark-button", Button).loading = False
+        table = self.query_one("#benchmark-table", DataTable)
+        table.clear()
+        for signature, result in results["functions"].items():
+            gas = result["gas"] or {}
+            latency = result["latency_ms"] or {}
+            old, new = diff[signature]
+            if result.get("skipped"):
+                change = f"skipped: {result['skipped']}"
+            elif not old or new is None:
+                change = "-"
+            else:
+                change = f"{new - old:+,.0f} ({(new - old) / old:+.1%})"
+            table.add_row(
+                signature,
+                format_metric(result["samples"]),
+                format_metric(result["errors"]),
+                format_metric(gas.get("min")),
+                format_metric(gas.get("median")),
+                format_metric(gas.get("max")),
+                format_metric(latency.get("median")),
+                change,
+            )
+
+        regressions = [s for s, (old, new) in diff.items() if old and new and new > old]
+        if regressions:
+            self.notify(
+                f"Gas regressed in: {', '.join(regressions)}", severity="warning"
+            )
+        self.notify(f"Benchmark saved to ./{path}")
 
     async def on_button_pressed(self, event: Button.Pressed) -> None:
         """Called when any button is clicked."""
 
         if event.button.id == "compile-button":
-            await self.compile_contract()
+            self.compile_contract()
         elif event.button.id == "generate-ape-button":
             code_view = self.query_one("#code-view", TextArea)
             try:
@@ -574,10 +1571,27 @@ class Sneko(App):
             active_account = self.query_one("#acct-select", Select).value
             pyperclip.copy(active_account)
             self.notify("Active account copied to clipboard")
+        elif event.button.id == "instance-button":
+            if self.contract is not None:
+                pyperclip.copy(self.contract.address)
+                self.notify("Contract address copied to clipboard")
+        elif event.button.id == "export-csv-button":
+            self.export_metrics("csv")
+        elif event.button.id == "export-json-button":
+            self.export_metrics("json")
+        elif event.button.id == "compare-button":
+            self.start_comparison()
+        elif event.button.id == "benchmark-button":
+            self.start_benchmark()
+        elif event.button.id == "profile-button":
+            self.start_profile()
         elif event.button.id == "deploy-button":
             await self.deploy_contract()
         elif event.button.id.startswith("fn-button-"):
-            await self.handle_contract_fn_button(event.button.id)
+            # a worker, so other input is handled while the call is in flight
+            self.run_worker(
+                self.handle_contract_fn_button(event.button.id), group="fn-call"
+            )
         else:
             log("unhandled button press event ~")
 
@@ -587,6 +1601,12 @@ class Sneko(App):
         """Called when a file in the directory tree is clicked."""
 
         event.stop()
+        # compile results for the previous file are no longer wanted; an
+        # in-flight deploy still lands in the instance registry
+        self.workers.cancel_group(self, "compile")
+        self.query_one("#compile-button", Button).loading = False
+        self.query_one("#deploy-button", Button).loading = False
+
         code_view = self.query_one("#code-view", TextArea)
         self.contract_path = event.path
         try:
@@ -604,13 +1624,16 @@ class Sneko(App):
 
             if file_extension == ".sol":
                 compiler_input = self.query_one("#compiler-version", Input)
-                compiler_input.value = f"solidity {SOLIDITY_VERSION}"
+                solc_version = select_solc_version([syntax.code], install=False)
+                compiler_input.value = f"solidity {solc_version or SOLIDITY_VERSION}"
+                if not self.solidity_prepared:
+                    self.prepare_solidity_compiler()
                 if self.solidity_loaded:
                     code_view.language = "solidity"
                 code_view.read_only = False
             elif file_extension == ".vy":
                 compiler_input = self.query_one("#compiler-version", Input)
-                compiler_input.value = f"vyper {vyper.version.version}"
+                compiler_input.value = f"vyper {VYPER_VERSION}"
                 if self.vyper_loaded:
                     code_view.language = "vyper"
                 code_view.read_only = True
@@ -623,9 +1646,82 @@ class Sneko(App):
             compile_button.disabled = False
             self.reset_inputs()
             await self.nuke_playground()
+            self.show_imports()
             self.query_one(TabbedContent).active = "compile-tab"
 
-    def reset_inputs(self) -> None:
+    @work(exclusive=True, thread=True, group="imports")
+    def build_import_graph(self) -> None:
+        """In the background, parse the imports of every Solidity file."""
+
+        graph = ImportGraph(self.contracts_root)
+        graph.build()
+        self.call_from_thread(self.on_import_graph_ready, graph)
+
+    def on_import_graph_ready(self, graph) -> None:
+        self.import_graph = graph
+        self.show_imports()
+
+    def poll_import_graph(self) -> None:
+        # only watch mode reacts to on-disk changes; stay idle otherwise
+        if self.watch_mode and self.import_graph is not None:
+            self.refresh_import_graph()
+
+    @work(exclusive=True, thread=True, group="imports")
+    def refresh_import_graph(self) -> None:
+        """In the background, re-read changed files and find what they affect."""
+
+        affected = self.import_graph.refresh()
+        if affected:
+            self.call_from_thread(self.handle_imports_changed, affected)
+
+    def handle_imports_changed(self, affected: set) -> None:
+        """Recompile the open file only if it (or something it imports) changed."""
+
+        self.show_imports()
+        if self.contract_path is None or Path(self.contract_path).suffix != ".sol":
+            return
+        if self.import_graph.unit_name(self.contract_path) in affected:
+            self.compiled_hash = None
+            self.compile_contract(automatic=True)
+
+    def show_imports(self) -> None:
+        """Render the open file's import tree and its dependents."""
+
+        tree = self.query_one("#import-tree", Tree)
+        tree.clear()
+        if self.contract_path is None or Path(self.contract_path).suffix != ".sol":
+            tree.root.set_label("(select a Solidity file)")
+            return
+        graph = self.import_graph
+        if graph is None:
+            tree.root.set_label("(building import graph...)")
+            return
+
+        unit = graph.unit_name(self.contract_path)
+        tree.root.set_label(unit)
+        dependencies = graph.dependencies(unit)
+        imports_node = tree.root.add(f"Imports ({len(dependencies)})", expand=True)
+        self.add_import_nodes(imports_node, unit, set())
+        dependents = graph.dependents(unit)
+        dependents_node = tree.root.add(f"Imported by ({len(dependents)})")
+        for dependent in sorted(dependents):
+            dependents_node.add_leaf(dependent)
+        tree.root.expand()
+
+    def add_import_nodes(self, node, unit: str, seen: set) -> None:
+        graph = self.import_graph
+        for dependency in graph.direct_imports(unit):
+            if graph.is_missing(dependency):
+                node.add_leaf(f"{dependency} (not found)")
+            elif dependency in seen or not graph.direct_imports(dependency):
+                node.add_leaf(dependency)
+            else:
+                seen.add(dependency)
+                self.add_import_nodes(node.add(dependency), dependency, seen)
+
+    def clear_artifact(self) -> None:
+        """Unload the shown contract's ABI and bytecode."""
+
         # Clear inputs
         abi_input = self.query_one("#abi-view", Input)
         abi_input.value = ""
@@ -641,15 +1737,38 @@ class Sneko(App):
         generate_script_button.disabled = True
         generate_ape_button = self.query_one("#generate-ape-button", Button)
         generate_ape_button.disabled = True
+        compare_button = self.query_one("#compare-button", Button)
+        compare_button.disabled = True
 
         self.abi = None
         self.bytecode = None
+        self.artifact_name = None
+        self.contract_abi = None
+        self.constructor_args = None
+
+    def reset_inputs(self) -> None:
+        self.clear_artifact()
+
+        contract_select = self.query_one("#contract-select", Select)
+        contract_select.set_options([])
+        contract_select.disabled = True
+
+        self.artifacts = {}
+        self.abis = {}
+        self.compiled_source = None
+        self.compiled_hash = None
 
     # Bindings
 
     def action_toggle_files(self) -> None:
         self.show_tree = not self.show_tree
 
+    def action_toggle_watch(self) -> None:
+        self.watch_mode = not self.watch_mode
+        self.notify(f"Watch mode {'on' if self.watch_mode else 'off'}")
+        if self.watch_mode and not self.query_one("#compile-button", Button).disabled:
+            self.compile_contract(automatic=True)
+
     def action_copy_to_clipboard(self) -> None:
         code_view = self.query_one("#code-view", TextArea)
         pyperclip.copy(code_view.text)
@@ -659,6 +1778,14 @@ class Sneko(App):
 def main():
     if len(sys.argv) == 1:
         Sneko().run()
+    elif sys.argv[1] == "compile":
+        from sneko.batch import run
+
+        sys.exit(run(sys.argv[2:]))
+    elif sys.argv[1] == "node":
+        from sneko.node import run
+
+        sys.exit(run(sys.argv[2:]))
     elif len(sys.argv) > 2:
         print("Error: too many arguments. See 'sneko --help' for usage.")
         sys.exit(1)
@@ -668,12 +1795,17 @@ def main():
     elif sys.argv[1] in ["help", "-h", "--help"]:
         print(
             f"\n{BOLD}Sneko:{RESET} a terminal GUI for Ethereum smart contracts",
-            f"\n\n{BOLD}[Usage]{RESET}\n sneko\n sneko [path]",
+            f"\n\n{BOLD}[Usage]{RESET}\n sneko\n sneko [path]\n sneko compile [path]"
+            "\n sneko node [--port]",
             f"\n\n{BOLD}[Options]{RESET}",
             "\n  -h, --help    Show this message and exit.",
             "\n  -v, --version Show the version and exit.",
             f"\n\n{BOLD}[Args]{RESET}",
             "\n  path          Path to a directory containing contracts",
+            f"\n\n{BOLD}[Commands]{RESET}",
+            "\n  compile       Compile every contract under path to JSON artifacts.",
+            "\n                See 'sneko compile --help' for options.",
+            "\n  node          Serve a local chain over JSON-RPC for SNEKO_RPC_URL.",
         )
         sys.exit(0)
     else:
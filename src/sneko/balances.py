@@ -0,0 +1,67 @@
+def batch_results(w3, requests: list) -> list:
+    """Send [(method, params), ...] as one JSON-RPC batch; raw results in order.
+
+    This goes to the provider directly: `w3.batch_requests()` captures every
+    call made on `w3` while it's open, from any thread, so it can't be used
+    while workers share one instance. Raises ValueError if a request failed.
+    """
+
+    responses = w3.provider.make_batch_request(requests)
+    for response in responses:
+        if "error" in response:
+            raise ValueError(response["error"])
+    return [response["result"] for response in responses]
+
+
+def read_balances(w3, accounts) -> list:
+    """Latest balances of `accounts`, in as few round trips as possible.
+
+    Providers that support JSON-RPC batches get one batch request; the
+    in-process eth-tester chain is read directly, skipping the per-call
+    request/middleware overhead.
+    """
+
+    if hasattr(w3.provider, "make_batch_request"):
+        results = batch_results(
+            w3, [("eth_getBalance", [account, "latest"]) for account in accounts]
+        )
+        return [int(result, 16) for result in results]
+
+    tester = getattr(w3.provider, "ethereum_tester", None)
+    if tester is not None:
+        with w3.provider.lock:
+            return [tester.get_balance(account) for account in accounts]
+
+    return [w3.eth.get_balance(account) for account in accounts]
+
+
+class BalanceCache:
+    """Account balances, re-read at most once per block."""
+
+    def __init__(self):
+        self.block_number = None
+        self.balances = {}
+
+    def invalidate(self) -> None:
+        """Force a re-read, e.g. after a revert rewinds the block number."""
+
+        self.block_number = None
+
+    def refresh(self, w3, accounts) -> dict:
+        """Re-read balances if a block was mined; returns those that changed."""
+
+        block_number = w3.eth.block_number
+        if block_number == self.block_number and all(
+            account in self.balances for account in accounts
+        ):
+            return {}
+
+        balances = dict(zip(accounts, read_balances(w3, accounts)))
+        changed = {
+            account: balance
+            for account, balance in balances.items()
+            if self.balances.get(account) != balance
+        }
+        self.balances.update(balances)
+        self.block_number = block_number
+        return changed
@@ -0,0 +1,150 @@
+import argparse
+import json
+import os
+import time
+
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+
+from sneko.compiler import compile_solidity, compile_vyper
+from sneko.config import Config
+from sneko.imports import source_unit_name
+from sneko.toolchain import ensure_solc, installed_solc_versions
+
+BOLD = Config.BOLD
+RESET = Config.RESET
+CONTRACT_SUFFIXES = (".sol", ".vy")
+
+
+def find_contracts(root: Path) -> list:
+    """Every Solidity and Vyper file under `root`, in a stable order."""
+
+    return sorted(
+        path
+        for path in root.rglob("*")
+        if path.suffix in CONTRACT_SUFFIXES and path.is_file()
+    )
+
+
+def compile_file(path: Path, root: Path) -> dict:
+    """Compile one contract file; runs inside a pool worker."""
+
+    started = time.perf_counter()
+    try:
+        if path.suffix == ".sol":
+            source_name = source_unit_name(path, root)
+            compiled = compile_solidity(
+                path.read_text(encoding="utf8"), str(root), source_name
+            )
+            contracts = {
+                key[len(source_name) + 1 :]: artifacts
+                for key, artifacts in compiled.items()
+            }
+        else:
+            contracts = {path.stem: compile_vyper(path)}
+    except Exception as e:
+        return {
+            "path": path,
+            "error": str(e),
+            "seconds": time.perf_counter() - started,
+        }
+
+    return {
+        "path": path,
+        "contracts": {
+            name: {
+                "abi": artifacts["abi"],
+                "bytecode": artifacts["bin"],
+                "runtime_bytecode": artifacts["bin-runtime"],
+            }
+            for name, artifacts in contracts.items()
+        },
+        "seconds": time.perf_counter() - started,
+    }
+
+
+def write_artifacts(result: dict, root: Path, out_dir: Path) -> None:
+    relative = result["path"].relative_to(root)
+    artifact_path = out_dir / relative.with_suffix(relative.suffix + ".json")
+    artifact_path.parent.mkdir(parents=True, exist_ok=True)
+    artifact_path.write_text(json.dumps(result["contracts"], indent=2), encoding="utf8")
+
+
+def compile_directory(root: Path, out_dir: Path, jobs=None) -> list:
+    """Compile every contract under `root` across a process pool."""
+
+    paths = find_contracts(root)
+    if any(path.suffix == ".sol" for path in paths) and not installed_solc_versions():
+        # install (if needed) once here, not racing in every worker
+        try:
+            ensure_solc(Config.SOLIDITY_VERSION)
+        except Exception:
+            pass  # each Solidity file will report the failure
+
+    results = []
+    with ProcessPoolExecutor(max_workers=jobs) as executor:
+        futures = [executor.submit(compile_file, path, root) for path in paths]
+        for future in as_completed(futures):
+            result = future.result()
+            if "contracts" in result:
+                write_artifacts(result, root, out_dir)
+            results.append(result)
+
+    return sorted(results, key=lambda result: result["path"])
+
+
+def print_summary(results: list, root: Path, elapsed: float) -> None:
+    width = max((len(str(r["path"].relative_to(root))) for r in results), default=0)
+    for result in results:
+        name = str(result["path"].relative_to(root)).ljust(width)
+        if "error" in result:
+            status = "FAILED"
+        else:
+            count = len(result["contracts"])
+            status = f"ok ({count} contract{'' if count == 1 else 's'})"
+        print(f"  {result['seconds']:7.2f}s  {name}  {status}")
+
+    for result in results:
+        if "error" in result:
+            print(f"\n{BOLD}{result['path'].relative_to(root)}{RESET}")
+            print(result["error"])
+
+    failures = sum("error" in result for result in results)
+    print(
+        f"\n{BOLD}{len(results) - failures} compiled, {failures} failed"
+        f"{RESET} in {elapsed:.2f}s"
+    )
+
+
+def run(argv: list) -> int:
+    """Entry point for `sneko compile <path>`; returns an exit code."""
+
+    parser = argparse.ArgumentParser(
+        prog="sneko compile",
+        description="Compile every .sol and .vy file under a directory.",
+    )
+    parser.add_argument("path", help="directory containing contracts")
+    parser.add_argument(
+        "-o",
+        "--out",
+        default="artifacts",
+        help="directory to write JSON artifacts to (default: ./artifacts)",
+    )
+    parser.add_argument(
+        "-j",
+        "--jobs",
+        type=int,
+        default=os.cpu_count(),
+        help="number of worker processes (default: CPU count)",
+    )
+    args = parser.parse_args(argv)
+
+    root = Path(args.path).resolve()
+    if not root.is_dir():
+        print(f"Error: {args.path} is not a directory.")
+        return 1
+
+    started = time.perf_counter()
+    results = compile_directory(root, Path(args.out), args.jobs)
+    print_summary(results, root, time.perf_counter() - started)
+    return 1 if any("error" in result for result in results) else 0
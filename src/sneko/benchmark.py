@@ -0,0 +1,189 @@
+import json
+import statistics
+import time
+
+from pathlib import Path
+
+from sneko.abi import ARRAY_REGEX
+
+# argument variants generated per function: small, medium and large values
+GENERATED_INT_VALUES = (1, 1000, 2**128)
+GENERATED_LENGTHS = (1, 32, 256)
+GENERATED_ARRAY_LENGTHS = (1, 4, 16)
+
+
+def _generate(abi_type: str, components, variant: int, accounts: list):
+    array = ARRAY_REGEX.match(abi_type)
+    if array:
+        length = (
+            int(array.group(2)) if array.group(2) else GENERATED_ARRAY_LENGTHS[variant]
+        )
+        return [
+            _generate(array.group(1), components, variant, accounts)
+            for _ in range(length)
+        ]
+    if abi_type == "tuple":
+        return tuple(
+            _generate(c["type"], c.get("components"), variant, accounts)
+            for c in components
+        )
+    if abi_type.startswith(("uint", "int")):
+        bits = int(abi_type.removeprefix("u").removeprefix("int") or 256)
+        limit = 2 ** (bits - (0 if abi_type.startswith("u") else 1)) - 1
+        return min(GENERATED_INT_VALUES[variant], limit)
+    if abi_type == "address":
+        return accounts[variant % len(accounts)]
+    if abi_type == "bool":
+        return variant % 2 == 0
+    if abi_type == "string":
+        return "s" * GENERATED_LENGTHS[variant]
+    if abi_type == "bytes":
+        return b"\x01" * GENERATED_LENGTHS[variant]
+    if abi_type.startswith("bytes"):
+        return bytes([variant + 1]) * int(abi_type[len("bytes") :])
+    raise ValueError(f"can't generate arguments of type {abi_type}")
+
+
+def generate_arg_sets(fn, accounts: list) -> list:
+    """Small, medium and large argument sets for an `AbiFunction`."""
+
+    if not fn.inputs:
+        return [[]]
+    return [
+        [
+            _generate(arg["type"], arg.get("components"), variant, accounts)
+            for arg in fn.inputs
+        ]
+        for variant in range(len(GENERATED_INT_VALUES))
+    ]
+
+
+def _distribution(values: list) -> dict:
+    if not values:
+        return None
+    return {
+        "min": min(values),
+        "median": statistics.median(values),
+        "max": max(values),
+        "mean": statistics.fmean(values),
+    }
+
+
+def _sample(w3, fn_call, is_tx: bool, account: str) -> tuple:
+    """(gas, latency in ms) of one invocation, reverted afterwards.
+
+    The provider lock is held throughout, so a playground transaction
+    can't be mined inside the snapshot and silently reverted with it.
+    """
+
+    with w3.provider.lock:
+        snapshot = w3.testing.snapshot()
+        try:
+            started = time.perf_counter()
+            if is_tx:
+                tx_hash = fn_call.transact({"from": account})
+                receipt = w3.eth.wait_for_transaction_receipt(tx_hash)
+                return receipt.gasUsed, (time.perf_counter() - started) * 1000
+            fn_call.call({"from": account})
+            latency_ms = (time.perf_counter() - started) * 1000
+            # a view costs what it would as a transaction; node estimates are
+            # too coarse (eth-tester's only resolve to within 21000 gas)
+            tx_hash = fn_call.transact({"from": account})
+            receipt = w3.eth.wait_for_transaction_receipt(tx_hash)
+            return receipt.gasUsed, latency_ms
+        finally:
+            w3.testing.revert(snapshot)
+
+
+def run_benchmark(
+    w3, deployment, plan: dict, runs: int, account: str, skipped=None
+) -> dict:
+    """Invoke each function in `plan` ({AbiFunction: [args, ...]}) `runs` times.
+
+    Every invocation starts from the same chain state: a snapshot is taken
+    before it and reverted to afterwards, so transactions don't skew later
+    samples. `skipped` ({signature: reason}) lists functions that couldn't
+    be given arguments. Returns gas and timing distributions keyed by
+    signature.
+    """
+
+    contract = deployment.contract
+    results = {}
+    for fn, arg_sets in plan.items():
+        gas, latency_ms, errors = [], [], []
+        for args in arg_sets:
+            for _ in range(runs):
+                try:
+                    fn_call = contract.get_function_by_signature(fn.signature)(*args)
+                    sample_gas, sample_latency_ms = _sample(
+                        w3, fn_call, fn.is_tx, account
+                    )
+                except Exception as e:
+                    errors.append(str(e))
+                    continue
+                gas.append(sample_gas)
+                latency_ms.append(sample_latency_ms)
+
+        results[fn.signature] = {
+            "samples": len(gas),
+            "errors": len(errors),
+            "first_error": errors[0] if errors else None,
+            "gas": _distribution(gas),
+            "latency_ms": _distribution(latency_ms),
+        }
+
+    for signature, reason in (skipped or {}).items():
+        results[signature] = {
+            "samples": 0,
+            "errors": 0,
+            "first_error": None,
+            "skipped": reason,
+            "gas": None,
+            "latency_ms": None,
+        }
+
+    return {
+        "contract": deployment.name,
+        "runs": runs,
+        "timestamp": time.time(),
+        "functions": results,
+    }
+
+
+def benchmark_path(directory, contract_name: str) -> Path:
+    return Path(directory) / f"{contract_name}.json"
+
+
+def load_results(path: Path):
+    try:
+        return json.loads(path.read_text(encoding="utf8"))
+    except (OSError, ValueError):
+        return None
+
+
+def save_results(results: dict, path: Path) -> None:
+    """Write results as stable, sorted JSON, so runs diff cleanly in git."""
+
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(
+        json.dumps(results, indent=2, sort_keys=True) + "\n", encoding="utf8"
+    )
+
+
+def diff_results(previous, current: dict) -> dict:
+    """Median gas change per signature: {signature: (old, new)}.
+
+    Functions that are new, or had no successful samples, get None for the
+    missing side.
+    """
+
+    previous_functions = previous["functions"] if previous else {}
+    diff = {}
+    for signature, result in current["functions"].items():
+        old = previous_functions.get(signature, {}).get("gas")
+        new = result["gas"]
+        diff[signature] = (
+            old["median"] if old else None,
+            new["median"] if new else None,
+        )
+    return diff
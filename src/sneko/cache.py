@@ -0,0 +1,98 @@
+import hashlib
+import json
+import os
+
+from pathlib import Path
+
+
+class ArtifactCache:
+    """A content-addressed, size-bounded on-disk cache for compiler output.
+
+    Each artifact is stored as a JSON file named after the hash of its inputs.
+    Reads bump the file's mtime, so eviction drops the least recently used
+    artifacts first once the cache grows past `max_bytes`.
+    """
+
+    def __init__(self, path, max_bytes):
+        self.path = Path(path)
+        self.max_bytes = max_bytes
+
+    @staticmethod
+    def key(**parts) -> str:
+        """Hash the compilation inputs into a cache key."""
+
+        blob = json.dumps(parts, sort_keys=True, separators=(",", ":"))
+        return hashlib.sha256(blob.encode("utf8")).hexdigest()
+
+    def _artifact_path(self, key: str) -> Path:
+        return self.path / f"{key}.json"
+
+    def get(self, key: str):
+        """Return the cached artifact for `key`, or None on a miss."""
+
+        artifact_path = self._artifact_path(key)
+        try:
+            with open(artifact_path, "r", encoding="utf8") as f:
+                artifact = json.load(f)
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError):
+            # unreadable or truncated entry; drop it and recompile
+            artifact_path.unlink(missing_ok=True)
+            return None
+
+        try:
+            os.utime(artifact_path)
+        except OSError:
+            pass
+        return artifact
+
+    def put(self, key: str, artifact) -> None:
+        """Store an artifact, then evict old entries if over budget."""
+
+        try:
+            self.path.mkdir(parents=True, exist_ok=True)
+            tmp_path = self.path / f".{key}.{os.getpid()}.tmp"
+            with open(tmp_path, "w", encoding="utf8") as f:
+                json.dump(artifact, f)
+            os.replace(tmp_path, self._artifact_path(key))
+        except OSError:
+            # a read-only or full cache dir should never break compilation
+            return
+
+        self.evict()
+
+    def evict(self) -> None:
+        """Remove least recently used artifacts until under `max_bytes`."""
+
+        entries = []
+        total = 0
+        for entry in os.scandir(self.path):
+            if not entry.name.endswith(".json"):
+                continue
+            try:
+                stat = entry.stat()
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, entry.path))
+            total += stat.st_size
+
+        if total <= self.max_bytes:
+            return
+
+        for _, size, path in sorted(entries):
+            try:
+                os.remove(path)
+            except OSError:
+                continue
+            total -= size
+            if total <= self.max_bytes:
+                break
+
+    def clear(self) -> None:
+        """Remove every cached artifact."""
+
+        if not self.path.exists():
+            return
+        for artifact_path in self.path.glob("*.json"):
+            artifact_path.unlink(missing_ok=True)
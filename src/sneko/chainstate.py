@@ -0,0 +1,229 @@
+import sqlite3
+import threading
+
+from eth.db.atomic import AtomicDB
+from eth.db.backends.base import BaseDB
+from web3 import (
+    EthereumTesterProvider,
+    HTTPProvider,
+    IPCProvider,
+    LegacyWebSocketProvider,
+    Web3,
+)
+
+from sneko.config import Config
+
+
+class SqliteDB(BaseDB):
+    """A py-evm key-value database stored in a SQLite file.
+
+    Keys are read on demand, so opening a large saved chain costs nothing
+    up front. Writes stay in the open transaction until the store is saved.
+    """
+
+    def __init__(self, connection: sqlite3.Connection, lock: threading.Lock):
+        self._connection = connection
+        self._lock = lock
+
+    def __getitem__(self, key: bytes) -> bytes:
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT value FROM state WHERE key = ?", (key,)
+            ).fetchone()
+        if row is None:
+            raise KeyError(key)
+        return row[0]
+
+    def __setitem__(self, key: bytes, value: bytes) -> None:
+        with self._lock:
+            self._connection.execute(
+                "INSERT OR REPLACE INTO state (key, value) VALUES (?, ?)",
+                (key, value),
+            )
+
+    def __delitem__(self, key: bytes) -> None:
+        with self._lock:
+            deleted = self._connection.execute(
+                "DELETE FROM state WHERE key = ?", (key,)
+            ).rowcount
+        if not deleted:
+            raise KeyError(key)
+
+    def _exists(self, key: bytes) -> bool:
+        with self._lock:
+            return (
+                self._connection.execute(
+                    "SELECT 1 FROM state WHERE key = ?", (key,)
+                ).fetchone()
+                is not None
+            )
+
+
+class ChainStore:
+    """A saved playground chain: py-evm state plus the deployments made on it."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        # used from the chain worker, deploy workers and the UI thread alike
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        self._connection.execute("PRAGMA journal_mode = WAL")
+        self._connection.execute(
+            "CREATE TABLE IF NOT EXISTS state (key BLOB PRIMARY KEY, value BLOB)"
+        )
+        self._connection.execute(
+            "CREATE TABLE IF NOT EXISTS deployments (address TEXT PRIMARY KEY, "
+            "name TEXT, abi TEXT, block_number INTEGER, gas_used INTEGER)"
+        )
+        self.db = SqliteDB(self._connection, self._lock)
+
+    @property
+    def is_new(self) -> bool:
+        with self._lock:
+            return self._connection.execute("SELECT 1 FROM state").fetchone() is None
+
+    def load_deployments(self) -> list:
+        """Saved deployments as (address, name, abi, block, gas) rows."""
+
+        with self._lock:
+            return self._connection.execute(
+                "SELECT address, name, abi, block_number, gas_used "
+                "FROM deployments ORDER BY rowid"
+            ).fetchall()
+
+    def save(self, deployments) -> None:
+        """Commit pending chain writes along with the current deployments."""
+
+        with self._lock:
+            self._connection.execute("DELETE FROM deployments")
+            self._connection.executemany(
+                "INSERT INTO deployments VALUES (?, ?, ?, ?, ?)",
+                [
+                    (d.address, d.name, d.abi.json, d.block_number, d.gas_used)
+                    for d in deployments
+                ],
+            )
+            self._connection.commit()
+
+    def commit(self) -> None:
+        """Commit pending chain writes, leaving saved deployments as they are."""
+
+        with self._lock:
+            self._connection.commit()
+
+    def close(self) -> None:
+        with self._lock:
+            self._connection.close()
+
+
+class SerialTesterProvider(EthereumTesterProvider):
+    """An eth-tester provider that's safe to call from several threads.
+
+    eth-tester isn't thread safe, and the playground calls it from the UI,
+    deploy and benchmark workers at once; requests take turns on `lock`.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.lock = threading.RLock()
+
+    def make_request(self, method, params):
+        with self.lock:
+            return super().make_request(method, params)
+
+
+class PooledHTTPProvider(HTTPProvider):
+    """An HTTP provider whose requests all share one `requests.Session`.
+
+    web3 (7.x) keeps a session per thread, and the playground calls from
+    many short-lived workers, each of which would open its own connection.
+    Requests here go through `session` instead, so they draw on one pool
+    of keep-alive connections. Only HTTPProvider's public request encoding
+    is used; web3's request cache and retries don't apply.
+    """
+
+    def __init__(self, endpoint_uri, session, **kwargs):
+        super().__init__(endpoint_uri, **kwargs)
+        self.session = session
+
+    def _post(self, data: bytes) -> bytes:
+        kwargs = {"timeout": Config.RPC_TIMEOUT, **self.get_request_kwargs()}
+        response = self.session.post(self.endpoint_uri, data=data, **kwargs)
+        response.raise_for_status()
+        return response.content
+
+    def make_request(self, method, params):
+        return self.decode_rpc_response(
+            self._post(self.encode_rpc_request(method, params))
+        )
+
+    def make_batch_request(self, requests):
+        responses = self.decode_rpc_response(
+            self._post(self.encode_batch_rpc_request(requests))
+        )
+        if isinstance(responses, dict):
+            # the node rejected the batch as a whole
+            raise ValueError(responses.get("error", responses))
+        return sorted(responses, key=lambda response: response.get("id") or 0)
+
+
+def rpc_provider(url: str):
+    """A provider for the JSON-RPC node at `url`: HTTP(S), WebSocket or IPC."""
+
+    if url.startswith(("http://", "https://")):
+        import requests
+
+        from requests.adapters import HTTPAdapter
+
+        session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=Config.RPC_POOL_SIZE)
+        session.mount("http://", adapter)
+        session.mount("https://", adapter)
+        return PooledHTTPProvider(url, session)
+    if url.startswith(("ws://", "wss://")):
+        return LegacyWebSocketProvider(url)
+    return IPCProvider(url)
+
+
+def connect_web3(chain_db=None, rpc_url=None):
+    """A Web3 instance on the playground chain.
+
+    With `rpc_url`, that's a running node (anvil, `sneko node`, ...).
+    Otherwise it's a local eth-tester chain; with `chain_db`, the chain lives
+    in that SQLite file and an existing file resumes where the last session
+    left off. Returns (w3, store or None).
+    """
+
+    if rpc_url:
+        provider = rpc_provider(rpc_url)
+        # requests to a node aren't serialized, but snapshot/revert sequences
+        # still hold this so the playground's own transactions can't land in
+        # the middle of them
+        provider.lock = threading.RLock()
+        w3 = Web3(provider)
+        if not w3.is_connected():
+            raise ConnectionError(f"no JSON-RPC node at {rpc_url}")
+        return w3, None
+
+    from eth_tester import EthereumTester, PyEVMBackend
+    from eth_tester.backends.pyevm.main import (
+        generate_genesis_state_for_keys,
+        get_default_genesis_params,
+    )
+
+    backend = PyEVMBackend()
+    store = None
+    if chain_db:
+        store = ChainStore(chain_db)
+        chain_class = type(backend.chain)
+        if store.is_new:
+            backend.chain = chain_class.from_genesis(
+                AtomicDB(store.db),
+                get_default_genesis_params(),
+                generate_genesis_state_for_keys(backend.account_keys),
+            )
+            store.save(())
+        else:
+            backend.chain = chain_class(AtomicDB(store.db))
+
+    return Web3(SerialTesterProvider(EthereumTester(backend))), store
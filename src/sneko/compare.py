@@ -0,0 +1,122 @@
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from sneko.compiler import compile_solidity, compile_vyper
+from sneko.imports import source_unit_name
+
+SOLIDITY_VARIANTS = {
+    "no optimizer": {},
+    "optimizer, runs 1": {"optimizer": {"enabled": True, "runs": 1}},
+    "optimizer, runs 200": {"optimizer": {"enabled": True, "runs": 200}},
+    "optimizer, runs 10000": {"optimizer": {"enabled": True, "runs": 10000}},
+    "via-IR, runs 200": {
+        "viaIR": True,
+        "optimizer": {"enabled": True, "runs": 200},
+    },
+}
+VYPER_VARIANTS = {
+    "-O none": "none",
+    "-O gas": "gas",
+    "-O codesize": "codesize",
+}
+
+
+def compile_variant(contract_path: Path, code: str, root: Path, option) -> dict:
+    """Compile one configuration; runs on a pool thread."""
+
+    if contract_path.suffix == ".sol":
+        source_name = source_unit_name(contract_path, root)
+        compiled = compile_solidity(code, str(root), source_name, option)
+        return {
+            key[len(source_name) + 1 :]: artifacts
+            for key, artifacts in compiled.items()
+        }
+    return {contract_path.stem: compile_vyper(contract_path, optimize=option)}
+
+
+def compile_variants(contract_path, code: str, root, jobs=None) -> dict:
+    """Compile `code` under every optimizer configuration.
+
+    Returns {variant label: {contract name: artifacts} or the exception}.
+    """
+
+    contract_path = Path(contract_path)
+    variants = SOLIDITY_VARIANTS if contract_path.suffix == ".sol" else VYPER_VARIANTS
+    results = {}
+    # threads, not processes: each solc run is its own process already, and
+    # a process pool can't be started from inside the TUI (its stdio is
+    # captured). The in-process Vyper compiler keeps global state, so its
+    # variants run one at a time.
+    if contract_path.suffix == ".sol":
+        jobs = jobs or len(variants)
+    else:
+        jobs = 1
+    with ThreadPoolExecutor(max_workers=jobs) as executor:
+        futures = {
+            label: executor.submit(
+                compile_variant, contract_path, code, Path(root), option
+            )
+            for label, option in variants.items()
+        }
+        for label, future in futures.items():
+            try:
+                results[label] = future.result()
+            except Exception as e:
+                results[label] = e
+    return results
+
+
+def _byte_length(hex_code: str) -> int:
+    return len(hex_code.removeprefix("0x")) // 2
+
+
+def _call_gas(w3, fn_call, account):
+    """Gas used by sending `fn_call` from the deployed state, or None.
+
+    The transaction is reverted, so each call is measured from the same
+    state. Node estimates are too coarse to compare variants with
+    (eth-tester's only resolve to within 21000 gas).
+    """
+
+    snapshot = w3.testing.snapshot()
+    try:
+        tx_hash = fn_call.transact({"from": account})
+        return w3.eth.wait_for_transaction_receipt(tx_hash).gasUsed
+    except Exception:
+        return None
+    finally:
+        w3.testing.revert(snapshot)
+
+
+def measure_variant(w3, artifacts, constructor_args, plan: dict, account) -> dict:
+    """Deploy one variant's artifacts and measure gas for each call in `plan`.
+
+    `plan` maps an `AbiFunction` to its arguments. The chain is reverted
+    afterwards, so measuring leaves no trace; the provider lock is held
+    throughout, so a playground transaction can't be reverted with it.
+    """
+
+    with w3.provider.lock:
+        snapshot = w3.testing.snapshot()
+        try:
+            factory = w3.eth.contract(abi=artifacts["abi"], bytecode=artifacts["bin"])
+            tx_hash = factory.constructor(*constructor_args).transact({"from": account})
+            receipt = w3.eth.wait_for_transaction_receipt(tx_hash)
+            contract = w3.eth.contract(
+                address=receipt.contractAddress, abi=artifacts["abi"]
+            )
+
+            call_gas = {}
+            for fn, args in plan.items():
+                call_gas[fn.signature] = _call_gas(
+                    w3, contract.get_function_by_signature(fn.signature)(*args), account
+                )
+
+            return {
+                "bytecode_bytes": _byte_length(artifacts["bin"]),
+                "runtime_bytes": _byte_length(artifacts["bin-runtime"]),
+                "deploy_gas": receipt.gasUsed,
+                "call_gas": call_gas,
+            }
+        finally:
+            w3.testing.revert(snapshot)
@@ -0,0 +1,271 @@
+import hashlib
+import importlib.metadata
+import os
+import posixpath
+import re
+import solcx
+import threading
+
+from pathlib import Path
+
+from sneko.cache import ArtifactCache
+from sneko.config import Config
+from sneko.profiler import solidity_pc_lines, vyper_pc_lines
+from sneko.toolchain import select_solc_version, solc_binary
+
+SOLIDITY_OUTPUT_SELECTION = [
+    "abi",
+    "evm.bytecode.object",
+    "evm.deployedBytecode.object",
+    "evm.deployedBytecode.sourceMap",
+]
+VYPER_OUTPUT_FORMATS = ["abi", "bytecode", "bytecode_runtime", "source_map_runtime"]
+MAIN_SOURCE = "<stdin>"
+OPENZEPPELIN_PREFIX = "@openzeppelin/contracts/"
+IMPORT_REGEX = re.compile(
+    r"""^\s*import\s+(?:[^;]*?\bfrom\s+)?["']([^"']+)["']""", re.MULTILINE
+)
+
+VYPER_VERSION = importlib.metadata.version("vyper")
+# vyper's compiler keeps global state, so in-process compiles from the
+# editor, watch mode and comparisons take turns
+_vyper_lock = threading.Lock()
+
+artifact_cache = ArtifactCache(Config.CACHE_PATH, Config.CACHE_MAX_BYTES)
+
+
+def _string_keys(mapping: dict) -> dict:
+    # the same shape artifacts have after a round trip through the JSON cache
+    return {str(key): value for key, value in mapping.items()}
+
+
+def _hash_text(text: str) -> str:
+    return hashlib.sha256(text.encode("utf8")).hexdigest()
+
+
+class SourceMap:
+    """In-memory contents of Solidity files, shared across compiles.
+
+    Entries are revalidated with a stat() call, so an edited file on disk is
+    re-read, but an unchanged OpenZeppelin import is only ever read once.
+    """
+
+    def __init__(self):
+        self._entries = {}
+        self._lock = threading.Lock()
+
+    def read(self, path: str):
+        """Return (text, sha256) for `path`, or None if it doesn't exist."""
+
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return None
+        stamp = (stat.st_mtime_ns, stat.st_size)
+
+        with self._lock:
+            entry = self._entries.get(path)
+        if entry is not None and entry[0] == stamp:
+            return entry[1], entry[2]
+
+        text = Path(path).read_text(encoding="utf8")
+        digest = _hash_text(text)
+        with self._lock:
+            self._entries[path] = (stamp, text, digest)
+        return text, digest
+
+    def preload(self, root: str) -> int:
+        """Read every Solidity file under `root`; returns the file count."""
+
+        count = 0
+        for dirpath, _, filenames in os.walk(root):
+            for filename in filenames:
+                if filename.endswith(".sol"):
+                    self.read(os.path.join(dirpath, filename))
+                    count += 1
+        return count
+
+
+source_map = SourceMap()
+
+
+def source_unit_path(unit_name: str, base_dir: str) -> str:
+    """Map a solc source unit name to its path on disk."""
+
+    if unit_name.startswith(OPENZEPPELIN_PREFIX):
+        return os.path.join(
+            Config.OPENZEPPELIN_PATH, unit_name[len(OPENZEPPELIN_PREFIX) :]
+        )
+    return os.path.join(base_dir, unit_name)
+
+
+def resolve_import(import_path: str, importer: str) -> str:
+    """Resolve an import directive to a source unit name, as solc would."""
+
+    if import_path.startswith(("./", "../")):
+        return posixpath.normpath(
+            posixpath.join(posixpath.dirname(importer), import_path)
+        )
+    return import_path
+
+
+def gather_sources(code: str, base_dir: str, source_name: str = MAIN_SOURCE) -> dict:
+    """Collect every source unit `code` transitively imports.
+
+    Returns {unit name: (text, sha256)}, with `code` itself under
+    `source_name`. Unresolvable imports are left out for solc to report.
+    """
+
+    sources = {source_name: (code, _hash_text(code))}
+    pending = [source_name]
+    while pending:
+        importer = pending.pop()
+        for import_path in IMPORT_REGEX.findall(sources[importer][0]):
+            unit_name = resolve_import(import_path, importer)
+            if unit_name in sources:
+                continue
+            entry = source_map.read(source_unit_path(unit_name, base_dir))
+            if entry is None:
+                continue
+            sources[unit_name] = entry
+            pending.append(unit_name)
+    return sources
+
+
+def compile_solidity(
+    code: str, base_dir: str = "", source_name: str = MAIN_SOURCE, settings=None
+) -> dict:
+    """Compile Solidity source, returning {"<source_name>:Name": artifacts}.
+
+    solc is driven through standard JSON with every source supplied inline,
+    so it never touches the filesystem itself. The newest local solc that
+    satisfies every source's pragma is used. Relative imports resolve
+    against `source_name`, and other source unit names against `base_dir`.
+    `settings` is merged into the standard JSON settings, e.g.
+    `{"optimizer": {"enabled": True, "runs": 200}, "viaIR": True}`.
+    """
+
+    sources = gather_sources(code, base_dir or os.getcwd(), source_name)
+    # every source's pragma must hold, imports included
+    version = select_solc_version(text for text, _ in sources.values())
+    key = artifact_cache.key(
+        compiler="solc",
+        version=str(version),
+        main=source_name,
+        sources={name: digest for name, (_, digest) in sources.items()},
+        outputs=SOLIDITY_OUTPUT_SELECTION,
+        settings=settings or {},
+    )
+    compiled = artifact_cache.get(key)
+    if compiled is not None:
+        return compiled
+
+    output = solcx.compile_standard(
+        {
+            "language": "Solidity",
+            "sources": {name: {"content": text} for name, (text, _) in sources.items()},
+            "settings": {
+                **(settings or {}),
+                "outputSelection": {
+                    source_name: {"*": SOLIDITY_OUTPUT_SELECTION},
+                },
+            },
+        },
+        solc_binary=solc_binary(version),
+    )
+    source_id = output.get("sources", {}).get(source_name, {}).get("id")
+    compiled = {
+        f"{source_name}:{name}": {
+            "abi": contract["abi"],
+            "bin": contract["evm"]["bytecode"]["object"],
+            "bin-runtime": contract["evm"]["deployedBytecode"]["object"],
+            # {pc: line} for the runtime code, for gas profiling
+            "pc-lines": _string_keys(
+                solidity_pc_lines(
+                    contract["evm"]["deployedBytecode"].get("sourceMap") or "",
+                    source_id,
+                    contract["evm"]["deployedBytecode"]["object"],
+                    code,
+                )
+            ),
+        }
+        for name, contract in output.get("contracts", {}).get(source_name, {}).items()
+    }
+    artifact_cache.put(key, compiled)
+    return compiled
+
+
+def compile_vyper(contract_path, executor=None, optimize=None) -> dict:
+    """Compile a Vyper file in-process, returning its ABI and bytecode.
+
+    In-process compiles run one at a time. Pass a `concurrent.futures`
+    executor (e.g. a process pool) to compile off the calling thread
+    instead. `optimize` is a `-O` level: "none", "gas" or "codesize"; by
+    default the contract's pragma (or vyper's default) applies.
+    """
+
+    contract_path = Path(contract_path).resolve()
+    try:
+        snekmate_version = importlib.metadata.version("snekmate")
+    except importlib.metadata.PackageNotFoundError:
+        snekmate_version = None
+    key = artifact_cache.key(
+        compiler="vyper",
+        version=VYPER_VERSION,
+        snekmate=snekmate_version,
+        source=_hash_text(contract_path.read_text(encoding="utf8")),
+        # sibling modules the contract may import relatively
+        modules={
+            path.name: source_map.read(str(path))[1]
+            for path in sorted(contract_path.parent.iterdir())
+            if path.suffix in (".vy", ".vyi") and path != contract_path
+        },
+        outputs=VYPER_OUTPUT_FORMATS,
+        optimize=optimize,
+    )
+    compiled = artifact_cache.get(key)
+    if compiled is not None:
+        return compiled
+
+    if executor is None:
+        with _vyper_lock:
+            compiled = _compile_vyper_file(str(contract_path), optimize)
+    else:
+        compiled = executor.submit(
+            _compile_vyper_file, str(contract_path), optimize
+        ).result()
+    artifact_cache.put(key, compiled)
+    return compiled
+
+
+def _compile_vyper_file(contract_path: str, optimize=None) -> dict:
+    # vyper is imported here rather than at module level: it is only needed
+    # once a Vyper file is compiled, and worker processes import it once
+    import vyper
+    from vyper.cli.vyper_compile import get_search_paths
+    from vyper.compiler.input_bundle import FilesystemInputBundle
+    from vyper.compiler.settings import OptimizationLevel, Settings
+
+    # same search paths as the `vyper` CLI, so snekmate imports resolve
+    input_bundle = FilesystemInputBundle(
+        get_search_paths([os.path.dirname(contract_path)])
+    )
+    artifacts = vyper.compile_from_file_input(
+        input_bundle.load_file(Path(contract_path)),
+        input_bundle=input_bundle,
+        settings=Settings(
+            optimize=OptimizationLevel.from_string(optimize) if optimize else None
+        ),
+        output_formats=VYPER_OUTPUT_FORMATS,
+    )
+    return {
+        "abi": artifacts["abi"],
+        "bin": artifacts["bytecode"],
+        "bin-runtime": artifacts["bytecode_runtime"],
+        "pc-lines": _string_keys(
+            vyper_pc_lines(
+                artifacts["source_map_runtime"]["pc_pos_map"],
+                artifacts["bytecode_runtime"],
+            )
+        ),
+    }
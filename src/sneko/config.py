@@ -28,11 +28,67 @@ class Config:
     BINDINGS = [
         ("v", "noop", VERSION),
         ("f", "toggle_files", "Toggle Files"),
+        ("ctrl+r", "toggle_watch", "Watch Mode"),
+        ("s", "snapshot", "Snapshot"),
+        ("u", "revert", "Revert"),
         ("ctrl+p", "copy_to_clipboard", "Copy Code"),
         ("ctrl+v", "paste_from_clipboard"),
         ("q", "quit", "Quit"),
     ]
     DEFAULT_CONTRACTS_PATH = os.path.join(os.path.dirname(__file__), "contracts")
+    OPENZEPPELIN_PATH = os.path.join(
+        DEFAULT_CONTRACTS_PATH, "solidity", "OpenZeppelin", "v5.0.2"
+    )
+
+    # Compiled artifacts are cached on disk, keyed by a hash of their inputs
+    CACHE_PATH = os.environ.get(
+        "SNEKO_CACHE_DIR", os.path.join(os.path.expanduser("~"), ".cache", "sneko")
+    )
+    CACHE_MAX_BYTES = 64 * 1024 * 1024
+
+    # Seconds the editor must be idle before watch mode recompiles
+    WATCH_DEBOUNCE = 0.5
+    # Seconds between on-disk import graph checks while in watch mode
+    IMPORT_POLL_INTERVAL = 2.0
+
+    # Playground sections start collapsed for contracts with more functions
+    FN_EXPANDED_LIMIT = 24
+    # Function entries mounted per screen refresh
+    FN_RENDER_BATCH = 12
+    # Seconds between checks for a new block to refresh the state dashboard
+    VIEWS_POLL_INTERVAL = 1.0
+
+    # Seconds between polls for new contract events, the most blocks asked
+    # for in one eth_getLogs request, and how many events the table shows
+    EVENTS_POLL_INTERVAL = 1.0
+    EVENTS_BLOCK_RANGE = 2000
+    EVENTS_TABLE_LIMIT = 500
+
+    # Directory of local solc binaries (solc-v<version> files) that Solidity
+    # pragmas are resolved against; unset means py-solc-x's ~/.solcx
+    SOLC_PATH = os.environ.get("SNEKO_SOLC_DIR") or None
+
+    # SQLite file the playground chain is saved to and resumed from; unset
+    # means a fresh in-memory chain every launch
+    CHAIN_DB = os.environ.get("SNEKO_CHAIN_DB") or None
+
+    # JSON-RPC node (http, ws or IPC path) the playground runs against instead
+    # of the in-process chain, e.g. anvil or `sneko node`
+    RPC_URL = os.environ.get("SNEKO_RPC_URL") or None
+    # Keep-alive HTTP connections kept open to that node
+    RPC_POOL_SIZE = 8
+    # Seconds to wait for the node to answer a request
+    RPC_TIMEOUT = 30
+
+    # Benchmark runs per argument set, and where results are saved (one JSON
+    # file per contract, diffed against the previous run)
+    BENCHMARK_RUNS = 5
+    BENCHMARK_PATH = "sneko-benchmarks"
+
+    # Never reach the network for solc or tree-sitter grammars
+    OFFLINE = os.environ.get("SNEKO_OFFLINE", "") not in ("", "0")
+    # Notify with cold vs. warm startup timings once the app is ready
+    REPORT_STARTUP = os.environ.get("SNEKO_REPORT_STARTUP", "") not in ("", "0")
 
     # ANSI escape codes for bold text
     BOLD = "\033[1m"
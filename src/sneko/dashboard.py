@@ -0,0 +1,130 @@
+import threading
+
+from sneko.abi import canonical_type, eth_utils
+from sneko.balances import batch_results
+
+
+def zero_arg_views(contract_abi) -> list:
+    """Every view or pure function that takes no arguments, in ABI order."""
+
+    return [fn for fn in contract_abi.functions if not fn.is_tx and not fn.inputs]
+
+
+def _checksum(abi_type: str, value):
+    # web3 returns checksummed addresses from contract calls; match it
+    if abi_type == "address":
+        return eth_utils().to_checksum_address(value)
+    if abi_type.endswith("]"):
+        item_type = abi_type[: abi_type.rindex("[")]
+        return [_checksum(item_type, item) for item in value]
+    return value
+
+
+def _decode(w3, fn, data: bytes):
+    types = [canonical_type(o) for o in fn.outputs]
+    values = [
+        _checksum(abi_type, value)
+        for abi_type, value in zip(types, w3.codec.decode(types, data))
+    ]
+    return values[0] if len(values) == 1 else tuple(values)
+
+
+def read_views(w3, address: str, functions: list, block_number: int) -> dict:
+    """Call every function in `functions` at `block_number`.
+
+    Calldata is just the selector, so it's built without web3's contract
+    machinery. JSON-RPC nodes get one batch request; if any call in it
+    fails, the calls are repeated one by one to find out which. The
+    in-process eth-tester chain is called directly. Returns {signature:
+    decoded value, or the exception raised}.
+    """
+
+    transactions = [{"to": address, "data": "0x" + fn.selector} for fn in functions]
+    if hasattr(w3.provider, "make_batch_request"):
+        try:
+            results = batch_results(
+                w3,
+                [
+                    ("eth_call", [transaction, hex(block_number)])
+                    for transaction in transactions
+                ],
+            )
+            return {
+                fn.signature: _decode(w3, fn, bytes.fromhex(data.removeprefix("0x")))
+                for fn, data in zip(functions, results)
+            }
+        except Exception:
+            pass
+
+    values = {}
+    tester = getattr(w3.provider, "ethereum_tester", None)
+    if tester is not None:
+        from eth_tester.exceptions import TransactionFailed
+
+        with w3.provider.lock:
+            # web3 fills in the first account as the sender, too
+            sender = tester.get_accounts()[0]
+            for fn, transaction in zip(functions, transactions):
+                try:
+                    data = tester.call({**transaction, "from": sender}, block_number)
+                    values[fn.signature] = _decode(
+                        w3, fn, bytes.fromhex(data.removeprefix("0x"))
+                    )
+                except TransactionFailed as e:
+                    # worded as web3 reports it
+                    values[fn.signature] = TransactionFailed(f"execution reverted: {e}")
+                except Exception as e:
+                    values[fn.signature] = e
+        return values
+
+    for fn, transaction in zip(functions, transactions):
+        try:
+            values[fn.signature] = _decode(
+                w3, fn, w3.eth.call(transaction, block_number)
+            )
+        except Exception as e:
+            values[fn.signature] = e
+    return values
+
+
+def format_view_value(value) -> str:
+    if isinstance(value, Exception):
+        # ContractLogicError's str() also carries the raw revert data
+        return f"error: {getattr(value, 'message', value)}"
+    if isinstance(value, bytes):
+        return "0x" + value.hex()
+    return str(value)
+
+
+class ViewDashboard:
+    """The zero-argument views of one deployment, re-read once per block."""
+
+    def __init__(self, deployment):
+        self.address = deployment.address
+        self.functions = zero_arg_views(deployment.abi)
+        self.block_number = None
+        self.values = {}
+        self._lock = threading.Lock()
+
+    def invalidate(self) -> None:
+        """Force a re-read, e.g. after a revert rewinds the chain."""
+
+        self.block_number = None
+
+    def refresh(self, w3) -> bool:
+        """Re-read the views if a block was mined; True if values were read.
+
+        A refresh already in progress (e.g. from the poll timer) wins.
+        """
+
+        if not self._lock.acquire(blocking=False):
+            return False
+        try:
+            block_number = w3.eth.block_number
+            if block_number == self.block_number:
+                return False
+            self.values = read_views(w3, self.address, self.functions, block_number)
+            self.block_number = block_number
+            return True
+        finally:
+            self._lock.release()
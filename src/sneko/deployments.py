@@ -0,0 +1,108 @@
+class Deployment:
+    """One deployed contract instance on the local chain."""
+
+    __slots__ = (
+        "address",
+        "name",
+        "abi",
+        "contract",
+        "block_number",
+        "gas_used",
+        "source_path",
+        "source",
+        "pc_lines",
+    )
+
+    def __init__(
+        self,
+        address,
+        name,
+        abi,
+        contract,
+        block_number,
+        gas_used,
+        source_path=None,
+        source=None,
+        pc_lines=None,
+    ):
+        self.address = address
+        self.name = name
+        self.abi = abi
+        self.contract = contract
+        self.block_number = block_number
+        self.gas_used = gas_used
+        # the code it was compiled from, for mapping gas to source lines;
+        # unknown for instances restored from an earlier session
+        self.source_path = source_path
+        self.source = source
+        self.pc_lines = pc_lines
+
+    @property
+    def label(self) -> str:
+        return f"{self.name} @ {self.address}"
+
+    @property
+    def summary(self) -> str:
+        return (
+            f"Contract address: {self.address} ({self.name}, "
+            f"block {self.block_number}, {self.gas_used:,} gas)"
+        )
+
+    def __repr__(self) -> str:
+        return f"<Deployment {self.label}>"
+
+
+class DeploymentRegistry:
+    """Every contract deployed this session, in deployment order.
+
+    Instances of the same artifact share one parsed `ContractAbi` and one
+    web3 contract factory, so deploying many copies keeps memory flat.
+    """
+
+    def __init__(self):
+        self.deployments = {}
+        self._abis = {}
+        self._factories = {}
+
+    def shared_abi(self, contract_abi):
+        """The registry's copy of an ABI identical to `contract_abi`."""
+
+        return self._abis.setdefault(contract_abi.json, contract_abi)
+
+    def add(
+        self, w3, name, contract_abi, address, block_number, gas_used, **source
+    ) -> Deployment:
+        contract_abi = self.shared_abi(contract_abi)
+        factory = self._factories.get(contract_abi.json)
+        if factory is None:
+            factory = w3.eth.contract(abi=contract_abi.raw)
+            self._factories[contract_abi.json] = factory
+
+        deployment = Deployment(
+            address,
+            name,
+            contract_abi,
+            factory(address=address),
+            block_number,
+            gas_used,
+            **source,
+        )
+        self.deployments[address] = deployment
+        return deployment
+
+    def prune(self, block_number: int) -> list:
+        """Forget deployments made after `block_number`, e.g. after a revert."""
+
+        pruned = [d for d in self if d.block_number > block_number]
+        for deployment in pruned:
+            del self.deployments[deployment.address]
+        return pruned
+
+    def get(self, address):
+        return self.deployments.get(address)
+
+    def __iter__(self):
+        return iter(self.deployments.values())
+
+    def __len__(self) -> int:
+        return len(self.deployments)
@@ -0,0 +1,258 @@
+import threading
+
+from sneko.abi import eth_utils
+from sneko.dashboard import format_view_value
+
+# head block hashes kept to find where the chain changed; older changes
+# rescan from the start
+KEPT_HASHES = 64
+
+
+class LoggedEvent:
+    """One decoded contract event."""
+
+    __slots__ = (
+        "block_number",
+        "log_index",
+        "tx_hash",
+        "address",
+        "contract",
+        "name",
+        "args",
+        "topics",
+    )
+
+    def __init__(self, contract_name: str, log, decoded):
+        self.block_number = log["blockNumber"]
+        self.log_index = log["logIndex"]
+        self.tx_hash = log["transactionHash"].to_0x_hex()
+        self.address = log["address"]
+        self.contract = contract_name
+        self.name = decoded["event"]
+        self.args = dict(decoded["args"])
+        self.topics = [topic.to_0x_hex() for topic in log["topics"]]
+
+    @property
+    def summary(self) -> str:
+        return ", ".join(
+            f"{name}={format_view_value(value)}" for name, value in self.args.items()
+        )
+
+    def __repr__(self) -> str:
+        return f"<LoggedEvent {self.name} @ block {self.block_number}>"
+
+
+def _chain_order(event: LoggedEvent) -> tuple:
+    return event.block_number, event.log_index
+
+
+class EventIndex:
+    """Decoded events in chain order, indexed by name, topic and block."""
+
+    def __init__(self):
+        self.version = 0
+        self._rebuild([])
+
+    def _rebuild(self, events: list) -> None:
+        # bumped whenever events are dropped or reordered, so views built
+        # from earlier contents know to start over
+        self.version += 1
+        self.events = []
+        self.keys = set()
+        self.by_name = {}
+        self.by_topic = {}
+        self.by_block = {}
+        for event in events:
+            self.add(event)
+
+    def add(self, event: LoggedEvent) -> None:
+        if _chain_order(event) in self.keys:
+            return  # already indexed, e.g. by a poll and a backfill
+        self.keys.add(_chain_order(event))
+        self.events.append(event)
+        self.by_name.setdefault(event.name, []).append(event)
+        for topic in event.topics:
+            self.by_topic.setdefault(topic, []).append(event)
+        self.by_block.setdefault(event.block_number, []).append(event)
+
+    def extend(self, events: list) -> None:
+        """Add events, keeping chain order even when they're backfilled."""
+
+        if (
+            events
+            and self.events
+            and _chain_order(events[0]) < _chain_order(self.events[-1])
+        ):
+            self._rebuild(sorted(self.events + events, key=_chain_order))
+        else:
+            for event in events:
+                self.add(event)
+
+    def prune(self, block_number: int) -> None:
+        """Forget events mined after `block_number`, e.g. after a revert."""
+
+        self._rebuild([e for e in self.events if e.block_number <= block_number])
+
+    def query(self, text: str) -> list:
+        """Events matching `text`: a block number, a 0x topic, or part of an
+        event name (case-insensitive). Blank matches everything."""
+
+        text = text.strip()
+        if not text:
+            return self.events
+        if text.isdigit():
+            return self.by_block.get(int(text), [])
+        if text.startswith("0x"):
+            return self.by_topic.get(text.lower(), [])
+        matches = [
+            event
+            for name, events in self.by_name.items()
+            if text.lower() in name.lower()
+            for event in events
+        ]
+        return sorted(matches, key=_chain_order)
+
+
+class EventLog:
+    """Streams events of tracked deployments into an `EventIndex`.
+
+    Each poll asks for logs only in blocks mined since the previous one,
+    in ranges of at most `block_range` blocks, so history is never
+    rescanned. Deployments tracked later are backfilled up to the cursor.
+
+    The hash of the head block is kept at every poll. If a later poll finds
+    a different block at that height (a snapshot was reverted and the
+    chain grew again, or a reorg), events are dropped back to the newest
+    kept block that's still on the chain and fetched again from there.
+    """
+
+    def __init__(self, block_range: int):
+        self.block_range = block_range
+        self.index = EventIndex()
+        self.last_block = None
+        self._hashes = {}
+        self._decoders = {}
+        self._lock = threading.Lock()
+
+    def _decoder(self, deployment) -> dict:
+        """{topic0: contract event} for a deployment; anonymous events have
+        no topic0 to match on and are skipped."""
+
+        log_topic = eth_utils().event_abi_to_log_topic
+        return {
+            log_topic(item).hex(): getattr(deployment.contract.events, item["name"])
+            for item in deployment.abi.raw
+            if item["type"] == "event" and not item.get("anonymous")
+        }
+
+    def _fetch(self, w3, addresses: list, from_block: int, to_block: int) -> list:
+        events = []
+        for start in range(from_block, to_block + 1, self.block_range):
+            logs = w3.eth.get_logs(
+                {
+                    "address": addresses,
+                    "fromBlock": start,
+                    "toBlock": min(start + self.block_range - 1, to_block),
+                }
+            )
+            for log in logs:
+                name, decoder, _ = self._decoders.get(log["address"], (None, {}, None))
+                if not log["topics"]:
+                    continue
+                event = decoder.get(log["topics"][0].hex())
+                if event is None:
+                    continue
+                try:
+                    decoded = event().process_log(log)
+                except Exception:
+                    continue  # same topic, different indexed layout
+                events.append(LoggedEvent(name, log, decoded))
+        return events
+
+    def _truncate(self, block_number) -> None:
+        """Forget events and block hashes after `block_number` (None: all)."""
+
+        if block_number is None:
+            self.index.prune(-1)
+            self._hashes = {}
+        else:
+            self.index.prune(block_number)
+            self._hashes = {n: h for n, h in self._hashes.items() if n <= block_number}
+        self.last_block = block_number
+
+    def _common_ancestor(self, w3, head):
+        """The newest block with a kept hash that's still on the chain."""
+
+        for block_number in sorted(self._hashes, reverse=True):
+            if block_number > head["number"]:
+                continue
+            if block_number == head["number"]:
+                block_hash = head["hash"]
+            else:
+                block_hash = w3.eth.get_block(block_number)["hash"]
+            if block_hash == self._hashes[block_number]:
+                return block_number
+        return None
+
+    def track(self, w3, deployment) -> list:
+        """Start following `deployment`; returns its events so far."""
+
+        with self._lock:
+            tracked = deployment.address in self._decoders
+            self._decoders[deployment.address] = (
+                deployment.name,
+                self._decoder(deployment),
+                deployment.block_number,
+            )
+            if (
+                tracked
+                or self.last_block is None
+                or deployment.block_number > self.last_block
+            ):
+                # polls already cover it, or the next one will
+                return []
+            events = self._fetch(
+                w3, [deployment.address], deployment.block_number, self.last_block
+            )
+            self.index.extend(events)
+            return events
+
+    def rewind(self, block_number: int) -> None:
+        """Drop events after `block_number`, and deployments made after it,
+        and poll again from there."""
+
+        with self._lock:
+            self._decoders = {
+                address: decoder
+                for address, decoder in self._decoders.items()
+                if decoder[2] <= block_number
+            }
+            if self.last_block is not None and block_number < self.last_block:
+                self._truncate(block_number)
+
+    def poll(self, w3):
+        """Fetch events mined since the last poll; returns the new ones, or
+        None if another poll is already running."""
+
+        if not self._lock.acquire(blocking=False):
+            return None
+        try:
+            head = w3.eth.get_block("latest")
+            latest = head["number"]
+            if self.last_block is not None:
+                ancestor = self._common_ancestor(w3, head)
+                if ancestor != self.last_block:
+                    # the chain changed under us (reverted elsewhere)
+                    self._truncate(ancestor)
+            from_block = 0 if self.last_block is None else self.last_block + 1
+            events = []
+            if self._decoders and from_block <= latest:
+                events = self._fetch(w3, list(self._decoders), from_block, latest)
+                self.index.extend(events)
+            self.last_block = latest
+            self._hashes[latest] = head["hash"]
+            if len(self._hashes) > KEPT_HASHES:
+                del self._hashes[min(self._hashes)]
+            return events
+        finally:
+            self._lock.release()
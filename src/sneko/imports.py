@@ -0,0 +1,130 @@
+import threading
+
+from collections import defaultdict
+from pathlib import Path
+
+from sneko.compiler import (
+    IMPORT_REGEX,
+    OPENZEPPELIN_PREFIX,
+    resolve_import,
+    source_map,
+    source_unit_path,
+)
+from sneko.config import Config
+
+
+def source_unit_name(path: Path, root: Path) -> str:
+    """The solc source unit name for `path`.
+
+    Bundled OpenZeppelin files get their `@openzeppelin/contracts/` name, so
+    their relative imports resolve exactly as they do for user contracts.
+    """
+
+    path = Path(path).resolve()
+    openzeppelin_root = Path(Config.OPENZEPPELIN_PATH).resolve()
+    if path.is_relative_to(openzeppelin_root):
+        return OPENZEPPELIN_PREFIX + path.relative_to(openzeppelin_root).as_posix()
+    return path.relative_to(root).as_posix()
+
+
+class ImportGraph:
+    """Import relationships between the Solidity files under `root`.
+
+    Nodes are solc source unit names; any OpenZeppelin files reachable
+    through `@openzeppelin/contracts/` imports are included too. `refresh()`
+    re-reads only files whose stat changed and reports which units must be
+    recompiled as a result.
+    """
+
+    def __init__(self, root):
+        self.root = Path(root).resolve()
+        self.imports = {}
+        self.imported_by = defaultdict(set)
+        self.digests = {}
+        self._lock = threading.Lock()
+
+    def unit_name(self, path) -> str:
+        return source_unit_name(path, self.root)
+
+    def _scan(self) -> list:
+        return [self.unit_name(path) for path in sorted(self.root.rglob("*.sol"))]
+
+    def _load(self, unit: str) -> None:
+        """(Re)parse `unit` and anything new it imports."""
+
+        pending = [unit]
+        while pending:
+            unit = pending.pop()
+            entry = source_map.read(source_unit_path(unit, str(self.root)))
+            for dependency in self.imports.get(unit, ()):
+                self.imported_by[dependency].discard(unit)
+
+            if entry is None:
+                self.imports[unit] = set()
+                self.digests[unit] = None
+                continue
+
+            text, self.digests[unit] = entry
+            self.imports[unit] = {
+                resolve_import(import_path, unit)
+                for import_path in IMPORT_REGEX.findall(text)
+            }
+            for dependency in self.imports[unit]:
+                self.imported_by[dependency].add(unit)
+                if dependency not in self.imports:
+                    pending.append(dependency)
+
+    def build(self) -> None:
+        """Parse every Solidity file under `root`."""
+
+        with self._lock:
+            for unit in self._scan():
+                if unit not in self.imports:
+                    self._load(unit)
+
+    def refresh(self) -> set:
+        """Pick up on-disk changes; returns the units that need recompiling."""
+
+        changed = set()
+        with self._lock:
+            for unit in set(self.imports) | set(self._scan()):
+                entry = source_map.read(source_unit_path(unit, str(self.root)))
+                digest = entry[1] if entry is not None else None
+                if unit not in self.imports or digest != self.digests[unit]:
+                    self._load(unit)
+                    changed.add(unit)
+            affected = set(changed)
+            for unit in changed:
+                affected |= self._walk(unit, self.imported_by)
+        return affected
+
+    def _walk(self, unit: str, edges) -> set:
+        seen = set()
+        pending = [unit]
+        while pending:
+            for neighbour in edges.get(pending.pop(), ()):
+                if neighbour not in seen:
+                    seen.add(neighbour)
+                    pending.append(neighbour)
+        seen.discard(unit)
+        return seen
+
+    def dependencies(self, unit: str) -> set:
+        """Every unit `unit` imports, directly or transitively."""
+
+        with self._lock:
+            return self._walk(unit, self.imports)
+
+    def dependents(self, unit: str) -> set:
+        """Every unit that imports `unit`, directly or transitively."""
+
+        with self._lock:
+            return self._walk(unit, self.imported_by)
+
+    def direct_imports(self, unit: str) -> list:
+        with self._lock:
+            return sorted(self.imports.get(unit, ()))
+
+    def is_missing(self, unit: str) -> bool:
+        with self._lock:
+            return self.digests.get(unit) is None
@@ -0,0 +1,134 @@
+import csv
+import json
+import statistics
+import time
+
+METRIC_FIELDS = (
+    "timestamp",
+    "contract",
+    "function",
+    "kind",
+    "gas_used",
+    "latency_ms",
+    "calldata_bytes",
+    "bytecode_bytes",
+    "runtime_bytes",
+)
+AGGREGATE_FIELDS = (
+    "contract",
+    "function",
+    "count",
+    "gas_min",
+    "gas_median",
+    "gas_max",
+    "latency_ms_min",
+    "latency_ms_median",
+    "latency_ms_max",
+)
+
+
+class CallMetric:
+    """Measurements for one deploy, transaction or call."""
+
+    __slots__ = METRIC_FIELDS
+
+    def __init__(
+        self,
+        contract,
+        function,
+        kind,
+        gas_used,
+        latency_ms,
+        calldata_bytes,
+        bytecode_bytes=None,
+        runtime_bytes=None,
+    ):
+        self.timestamp = time.time()
+        self.contract = contract
+        self.function = function
+        self.kind = kind
+        self.gas_used = gas_used
+        self.latency_ms = latency_ms
+        self.calldata_bytes = calldata_bytes
+        self.bytecode_bytes = bytecode_bytes
+        self.runtime_bytes = runtime_bytes
+
+    def as_dict(self) -> dict:
+        return {field: getattr(self, field) for field in METRIC_FIELDS}
+
+
+def _spread(values: list) -> tuple:
+    """(min, median, max) of the non-missing values, or Nones."""
+
+    values = [v for v in values if v is not None]
+    if not values:
+        return None, None, None
+    return min(values), statistics.median(values), max(values)
+
+
+def timed(fn, *args) -> tuple:
+    """Call `fn(*args)`; returns (its result, elapsed milliseconds)."""
+
+    started = time.perf_counter()
+    result = fn(*args)
+    return result, (time.perf_counter() - started) * 1000
+
+
+def format_metric(value) -> str:
+    if value is None:
+        return "-"
+    if isinstance(value, float):
+        return f"{value:,.1f}"
+    if isinstance(value, int):
+        return f"{value:,}"
+    return str(value)
+
+
+class MetricsLog:
+    """Every measured interaction this session, with per-function summaries."""
+
+    def __init__(self):
+        self.records = []
+
+    def record(self, *args, **kwargs) -> CallMetric:
+        metric = CallMetric(*args, **kwargs)
+        self.records.append(metric)
+        return metric
+
+    def aggregates(self) -> list:
+        """One summary row per (contract, function), in first-seen order."""
+
+        groups = {}
+        for metric in self.records:
+            groups.setdefault((metric.contract, metric.function), []).append(metric)
+
+        rows = []
+        for (contract, function), metrics in groups.items():
+            gas = _spread([m.gas_used for m in metrics])
+            latency = _spread([m.latency_ms for m in metrics])
+            rows.append(
+                dict(
+                    zip(
+                        AGGREGATE_FIELDS,
+                        (contract, function, len(metrics), *gas, *latency),
+                    )
+                )
+            )
+        return rows
+
+    def export_csv(self, path: str) -> None:
+        with open(path, "w", newline="") as f:
+            writer = csv.DictWriter(f, fieldnames=METRIC_FIELDS)
+            writer.writeheader()
+            writer.writerows(metric.as_dict() for metric in self.records)
+
+    def export_json(self, path: str) -> None:
+        with open(path, "w") as f:
+            json.dump(
+                {
+                    "records": [metric.as_dict() for metric in self.records],
+                    "aggregates": self.aggregates(),
+                },
+                f,
+                indent=2,
+            )
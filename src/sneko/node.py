@@ -0,0 +1,207 @@
+import argparse
+import ast
+import json
+
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from sneko.config import Config
+
+BOLD = Config.BOLD
+RESET = Config.RESET
+
+
+def to_wire(value):
+    """Convert a web3-formatted result back into JSON-RPC wire format."""
+
+    if value is None or isinstance(value, (bool, str)):
+        return value
+    if isinstance(value, int):
+        return hex(value)
+    if isinstance(value, (bytes, bytearray)):
+        return "0x" + bytes(value).hex()
+    if isinstance(value, dict) or hasattr(value, "items"):
+        return {key: to_wire(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [to_wire(item) for item in value]
+    return str(value)
+
+
+def _revert_data(reason: str):
+    """The raw revert data, if eth-tester couldn't decode it as Error(string).
+
+    eth-tester reports a decoded reason as text, and any other revert data
+    (including none) as the repr of its bytes.
+    """
+
+    if not reason.startswith(("b'", 'b"')):
+        return None
+    try:
+        data = ast.literal_eval(reason)
+    except (SyntaxError, ValueError):
+        return None
+    return data if isinstance(data, bytes) else None
+
+
+def struct_logs(steps: list) -> list:
+    """geth-style struct logs for a profiler trace; depths count from 1."""
+
+    return [
+        {
+            "pc": step.pc,
+            "op": step.op,
+            "gas": step.gas,
+            "gasCost": step.gas_cost,
+            "depth": step.depth + 1,
+        }
+        for step in steps
+    ]
+
+
+def rpc_error(e: Exception) -> dict:
+    """A JSON-RPC error object for an exception raised by the chain."""
+
+    from eth_abi import encode
+    from eth_tester.exceptions import TransactionFailed
+    from web3.exceptions import ContractLogicError, Web3RPCError
+
+    if isinstance(e, TransactionFailed):
+        reason = str(e).removeprefix("execution reverted").removeprefix(": ")
+        data = _revert_data(reason)
+        if data is not None:
+            # a bare revert or a custom error: forward its data unchanged
+            error = {"code": 3, "message": "execution reverted"}
+            if data:
+                error["data"] = "0x" + data.hex()
+            return error
+        error = {"code": 3, "message": f"execution reverted: {reason}"}
+        # clients decode the reason from Error(string) revert data
+        error["data"] = "0x08c379a0" + encode(["string"], [reason]).hex()
+        return error
+    if isinstance(e, ContractLogicError):
+        error = {"code": 3, "message": e.message}
+        if isinstance(e.data, str):
+            error["data"] = e.data
+        return error
+    if isinstance(e, Web3RPCError) and isinstance(e.rpc_response, dict):
+        error = e.rpc_response.get("error")
+        if isinstance(error, dict):
+            return error
+    return {"code": -32000, "message": str(e)}
+
+
+class ChainNode:
+    """Answers JSON-RPC requests from an in-process eth-tester chain."""
+
+    def __init__(self, w3):
+        # connect_web3's provider serializes requests from server threads
+        self.w3 = w3
+
+    def handle(self, request):
+        if isinstance(request, list):
+            return [self.handle_one(item) for item in request]
+        return self.handle_one(request)
+
+    def handle_one(self, request: dict) -> dict:
+        response = {"jsonrpc": "2.0", "id": request.get("id")}
+        method, params = request["method"], request.get("params") or []
+        try:
+            if method in ("debug_traceTransaction", "debug_traceCall"):
+                # struct logs are plain JSON numbers, not quantities
+                response["result"] = self.debug_trace(method, params)
+            else:
+                result = self.w3.manager.request_blocking(method, params)
+                response["result"] = to_wire(result)
+        except Exception as e:
+            response["error"] = rpc_error(e)
+        return response
+
+    def debug_trace(self, method: str, params: list) -> dict:
+        """Answer a debug_trace* request by re-executing it in py-evm.
+
+        Only the opcode struct logs are returned (no stack, memory or
+        storage), and calls can only be traced on the latest block.
+        """
+
+        from sneko.profiler import trace
+
+        if method == "debug_traceTransaction":
+            steps = trace(self.w3, tx_hash=bytes.fromhex(params[0].removeprefix("0x")))
+        else:
+            call = params[0]
+            if len(params) > 1 and params[1] not in ("latest", "pending"):
+                raise ValueError("calls can only be traced on the latest block")
+            if not call.get("to"):
+                raise ValueError("contract creations can't be traced")
+            steps = trace(
+                self.w3,
+                transaction={
+                    "from": call.get("from") or "0x" + "00" * 20,
+                    "to": call["to"],
+                    "data": call.get("data") or call.get("input") or "0x",
+                    "value": int(call.get("value") or "0x0", 16),
+                },
+            )
+        return {"structLogs": struct_logs(steps)}
+
+
+def make_handler(node: ChainNode):
+    class RPCHandler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"  # keep-alive, so clients can pool
+        disable_nagle_algorithm = True
+
+        def do_POST(self):
+            length = int(self.headers.get("Content-Length", 0))
+            try:
+                request = json.loads(self.rfile.read(length))
+                body = node.handle(request)
+            except ValueError:
+                body = {
+                    "jsonrpc": "2.0",
+                    "id": None,
+                    "error": {"code": -32700, "message": "Parse error"},
+                }
+            payload = json.dumps(body).encode("utf8")
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(payload)))
+            self.end_headers()
+            self.wfile.write(payload)
+
+        def log_message(self, format, *args):
+            pass
+
+    return RPCHandler
+
+
+def run(argv: list) -> int:
+    """Entry point for `sneko node`; returns an exit code."""
+
+    parser = argparse.ArgumentParser(
+        prog="sneko node",
+        description="Serve a local development chain over JSON-RPC.",
+    )
+    parser.add_argument(
+        "--host", default="127.0.0.1", help="address to bind (default: 127.0.0.1)"
+    )
+    parser.add_argument(
+        "-p", "--port", type=int, default=8545, help="port (default: 8545)"
+    )
+    args = parser.parse_args(argv)
+
+    from sneko.chainstate import connect_web3
+
+    w3, store = connect_web3(Config.CHAIN_DB)
+    server = ThreadingHTTPServer((args.host, args.port), make_handler(ChainNode(w3)))
+    url = f"http://{args.host}:{server.server_port}"
+    print(f"{BOLD}sneko node{RESET} listening on {url}")
+    print(f"Run the playground against it with SNEKO_RPC_URL={url} sneko")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        if store is not None:
+            store.commit()
+            store.close()
+    return 0
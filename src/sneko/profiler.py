@@ -0,0 +1,273 @@
+import bisect
+import re
+
+LINK_PLACEHOLDER_REGEX = re.compile(r"__\$[0-9a-fA-F]{34}\$__")
+# opcodes whose cost includes the gas spent by the frame they start
+FRAME_OPCODES = {"CALL", "CALLCODE", "DELEGATECALL", "STATICCALL", "CREATE", "CREATE2"}
+
+
+class TraceStep:
+    """One executed opcode. `gas_cost` excludes any call frame it started;
+    `gas` is what the frame had left before it ran, where known."""
+
+    __slots__ = ("depth", "address", "pc", "op", "gas_cost", "gas")
+
+    def __init__(self, depth, address, pc, op, gas_cost=0, gas=None):
+        self.depth = depth
+        self.address = address
+        self.pc = pc
+        self.op = op
+        self.gas_cost = gas_cost
+        self.gas = gas
+
+
+def _tracing_computation(computation_class, steps: list):
+    """A subclass of a py-evm computation that records every opcode it runs.
+
+    Child frames are built from the same class, so nested calls are traced
+    too.
+    """
+
+    from eth_utils import to_checksum_address
+
+    def traced(opcode_fn):
+        mnemonic = (
+            getattr(opcode_fn, "mnemonic", None) or opcode_fn.__wrapped__.mnemonic
+        )
+
+        def run(computation):
+            msg = computation.msg
+            step = TraceStep(
+                msg.depth,
+                None if msg.is_create else to_checksum_address(msg.code_address),
+                computation.code.program_counter - 1,
+                mnemonic,
+            )
+            steps.append(step)
+            gas = step.gas = computation.get_gas_remaining()
+            children = len(computation.children)
+            try:
+                opcode_fn(computation=computation)
+            finally:
+                step.gas_cost = (
+                    gas
+                    - computation.get_gas_remaining()
+                    - sum(c.get_gas_used() for c in computation.children[children:])
+                )
+
+        return run
+
+    return type(
+        "TracingComputation",
+        (computation_class,),
+        {
+            "opcodes": {
+                opcode: traced(opcode_fn)
+                for opcode, opcode_fn in computation_class.opcodes.items()
+            }
+        },
+    )
+
+
+def _trace_pyevm(chain, tx_hash=None, transaction=None) -> list:
+    """Re-execute a mined transaction, or simulate `transaction` on the
+    latest state, with a tracing computation. Nothing is persisted."""
+
+    from eth.vm.spoof import SpoofTransaction
+    from eth_utils import to_canonical_address
+
+    steps = []
+    if tx_hash is not None:
+        block_number, index = chain.get_canonical_transaction_index(tx_hash)
+        # the lookup outlives a snapshot revert; make sure the block didn't
+        if block_number > chain.get_canonical_head().block_number:
+            raise ValueError(f"transaction {tx_hash.hex()} was reverted")
+        block = chain.get_canonical_block_by_number(block_number)
+        if block.transactions[index].hash != tx_hash:
+            raise ValueError(f"transaction {tx_hash.hex()} was reverted")
+        parent = chain.get_block_header_by_hash(block.header.parent_hash)
+        with chain.get_vm(at_header=parent).in_costless_state() as state:
+            for earlier in block.transactions[:index]:
+                state.apply_transaction(earlier)
+            state.computation_class = _tracing_computation(
+                state.computation_class, steps
+            )
+            state.apply_transaction(block.transactions[index])
+        return steps
+
+    vm = chain.get_vm()
+    with vm.in_costless_state() as state:
+        sender = to_canonical_address(transaction["from"])
+        unsigned = vm.create_unsigned_transaction(
+            nonce=state.get_nonce(sender),
+            gas_price=0,
+            gas=vm.get_header().gas_limit,
+            to=to_canonical_address(transaction["to"]),
+            value=transaction.get("value", 0),
+            data=bytes.fromhex(transaction["data"].removeprefix("0x")),
+        )
+        state.computation_class = _tracing_computation(state.computation_class, steps)
+        state.apply_transaction(SpoofTransaction(unsigned, from_=sender))
+    return steps
+
+
+def _exclusive_costs(struct_logs: list) -> list:
+    """Per-step gas from geth-style struct logs, with call frames' gas taken
+    out of the opcode that started them."""
+
+    costs = [log["gasCost"] for log in struct_logs]
+    suffix = [0] * (len(struct_logs) + 1)
+    next_at_depth = {}
+    for i in range(len(struct_logs) - 1, -1, -1):
+        depth = struct_logs[i]["depth"]
+        if struct_logs[i]["op"] in FRAME_OPCODES:
+            j = next_at_depth.get(depth)
+            if j is not None:
+                inclusive = struct_logs[i]["gas"] - struct_logs[j]["gas"]
+                costs[i] = inclusive - (suffix[i + 1] - suffix[j])
+        suffix[i] = suffix[i + 1] + costs[i]
+        next_at_depth = {d: k for d, k in next_at_depth.items() if d < depth}
+        next_at_depth[depth] = i
+    return costs
+
+
+def _trace_rpc(w3, tx_hash=None, transaction=None) -> list:
+    """Trace through the node's debug_trace* methods (anvil, geth)."""
+
+    options = {"disableStack": True, "disableMemory": True, "disableStorage": True}
+    if tx_hash is not None:
+        to = w3.eth.get_transaction(tx_hash)["to"]
+        response = w3.provider.make_request(
+            "debug_traceTransaction", ["0x" + tx_hash.hex(), options]
+        )
+    else:
+        to = transaction["to"]
+        call = {**transaction, "value": hex(transaction.get("value", 0))}
+        response = w3.provider.make_request(
+            "debug_traceCall", [call, "latest", options]
+        )
+    if "error" in response:
+        raise ValueError(
+            f"the node can't trace: {response['error'].get('message', '')}"
+        )
+    struct_logs = response["result"]["structLogs"]
+    return [
+        # only the top-level frame's code address is known from struct logs
+        TraceStep(
+            log["depth"],
+            to if log["depth"] == 1 else None,
+            log["pc"],
+            log["op"],
+            cost,
+            log["gas"],
+        )
+        for log, cost in zip(struct_logs, _exclusive_costs(struct_logs))
+    ]
+
+
+def trace(w3, tx_hash=None, transaction=None) -> list:
+    """Opcode-level trace of a mined transaction (`tx_hash`) or of a call
+    simulated on the latest state (`transaction`, e.g. one that reverts)."""
+
+    tester = getattr(w3.provider, "ethereum_tester", None)
+    if tester is None:
+        return _trace_rpc(w3, tx_hash, transaction)
+    with w3.provider.lock:
+        return _trace_pyevm(tester.backend.chain, tx_hash, transaction)
+
+
+def opcode_profile(steps: list) -> list:
+    """(opcode, count, gas) rows, most expensive first."""
+
+    totals = {}
+    for step in steps:
+        count, gas = totals.get(step.op, (0, 0))
+        totals[step.op] = (count + 1, gas + step.gas_cost)
+    return sorted(
+        ((op, count, gas) for op, (count, gas) in totals.items()),
+        key=lambda row: row[2],
+        reverse=True,
+    )
+
+
+def _instruction_pcs(code: bytes) -> list:
+    """The pc of each instruction, in order; PUSH data is skipped."""
+
+    pcs = []
+    pc = 0
+    while pc < len(code):
+        pcs.append(pc)
+        opcode = code[pc]
+        pc += 1 + (opcode - 0x5F if 0x60 <= opcode <= 0x7F else 0)
+    return pcs
+
+
+def _code_bytes(code_hex: str) -> bytes:
+    # unlinked library addresses are placeholders inside PUSH20 data
+    return bytes.fromhex(
+        LINK_PLACEHOLDER_REGEX.sub("0" * 40, code_hex.removeprefix("0x"))
+    )
+
+
+def solidity_pc_lines(srcmap: str, source_id: int, code_hex: str, source: str) -> dict:
+    """{pc: 1-based line of `source`} from solc's compressed source map,
+    which has one entry per instruction. Instructions from other sources
+    (imports) or with no source location are left out."""
+
+    # solc offsets count bytes, not characters
+    text = source.encode("utf8")
+    line_starts = [0] + [i + 1 for i, byte in enumerate(text) if byte == 0x0A]
+    lines = {}
+    offset, file_index = -1, -1
+    for pc, entry in zip(_instruction_pcs(_code_bytes(code_hex)), srcmap.split(";")):
+        # empty fields repeat the previous entry's value
+        fields = entry.split(":")
+        if fields[0]:
+            offset = int(fields[0])
+        if len(fields) > 2 and fields[2]:
+            file_index = int(fields[2])
+        if file_index == source_id and offset >= 0:
+            lines[pc] = bisect.bisect_right(line_starts, offset)
+    return lines
+
+
+def vyper_pc_lines(pc_pos_map: dict, code_hex: str) -> dict:
+    """{pc: 1-based line} from vyper's runtime `pc_pos_map`.
+
+    vyper only marks the pc where each node's code starts, so every
+    instruction takes the line of the closest marked pc before it. The
+    span covering the whole module (the selector dispatcher) is left out.
+    """
+
+    marks = sorted(
+        (int(pc), None if position[:2] == (1, 0) else position[0])
+        for pc, position in pc_pos_map.items()
+        if position
+    )
+    lines = {}
+    line = None
+    pending = iter(marks)
+    mark = next(pending, None)
+    for pc in _instruction_pcs(_code_bytes(code_hex)):
+        while mark is not None and mark[0] <= pc:
+            line = mark[1]
+            mark = next(pending, None)
+        if line is not None:
+            lines[pc] = line
+    return lines
+
+
+def line_profile(steps: list, address: str, lines: dict) -> dict:
+    """Gas per source line for the steps run by `address`'s own code.
+
+    `lines` is an artifact's "pc-lines" map; gas at pcs with no line is
+    totalled under None.
+    """
+
+    totals = {}
+    for step in steps:
+        if step.address != address:
+            continue
+        line = lines.get(str(step.pc))
+        totals[line] = totals.get(line, 0) + step.gas_cost
+    return totals
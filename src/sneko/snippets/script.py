@@ -1,11 +1,17 @@
+import os
+
 from web3 import Web3, EthereumTesterProvider
 
 
-w3 = Web3(EthereumTesterProvider())
+# run against a local node (e.g. anvil) if SNEKO_RPC_URL is set:
+if os.environ.get("SNEKO_RPC_URL"):
+    w3 = Web3(Web3.HTTPProvider(os.environ["SNEKO_RPC_URL"]))
+else:
+    w3 = Web3(EthereumTesterProvider())
 contract_factory = w3.eth.contract(abi=ABI, bytecode=BYTECODE)
 
 # provide `constructor` args if necessary:
-tx_hash = contract_factory.constructor().transact()
+tx_hash = contract_factory.constructor().transact({"from": w3.eth.accounts[0]})
 contract_address = w3.eth.get_transaction_receipt(tx_hash)["contractAddress"]
 contract = w3.eth.contract(address=contract_address, abi=ABI)
 
@@ -0,0 +1,183 @@
+import re
+import solcx
+import threading
+import tree_sitter_types.parser as tst
+
+from packaging.specifiers import SpecifierSet
+from packaging.version import Version
+
+from sneko.config import Config
+
+GRAMMARS = {
+    "solidity": (
+        "https://github.com/JoranHonig/tree-sitter-solidity",
+        "tree-sitter-solidity",
+    ),
+    "vyper": ("https://github.com/madlabman/tree-sitter-vyper", "tree-sitter-vyper"),
+}
+
+SOLIDITY_PRAGMA_REGEX = re.compile(r"^\s*pragma\s+solidity\s+([^;]+);", re.MULTILINE)
+PRAGMA_TERM_REGEX = re.compile(r"(\^|~|>=|<=|>|<|=)?\s*v?(\d+(?:\.\d+){0,2})")
+
+_solc_lock = threading.Lock()
+# warm compiler handles: resolved binary paths by version, and the installed
+# versions, re-listed only when the binaries directory changes
+_solc_binaries = {}
+_installed = (None, [])
+
+
+class ToolchainUnavailable(Exception):
+    """Raised when a tool is missing and offline mode forbids installing it."""
+
+
+def _bump(parts: list, index: int) -> str:
+    upper = parts[: index + 1]
+    upper[index] += 1
+    return ".".join(str(part) for part in upper + [0] * (2 - index))
+
+
+def _term_specifiers(operator: str, version: str) -> list:
+    parts = [int(part) for part in version.split(".")]
+    full = ".".join(str(part) for part in parts + [0] * (3 - len(parts)))
+    if operator == "^":
+        # ^0.8.1 allows 0.8.x from 0.8.1 on; ^1.2.3 allows 1.x.y from 1.2.3 on
+        first_nonzero = next((i for i, p in enumerate(parts) if p), len(parts) - 1)
+        return [f">={full}", f"<{_bump(parts, first_nonzero)}"]
+    if operator == "~":
+        return [f">={full}", f"<{_bump(parts, min(len(parts) - 1, 1))}"]
+    if operator in (None, "", "="):
+        if len(parts) < 3:
+            return [f"=={'.'.join(map(str, parts))}.*"]
+        return [f"=={full}"]
+    return [f"{operator}{full}"]
+
+
+def parse_solidity_pragma(spec: str) -> list:
+    """Turn a `pragma solidity` constraint into SpecifierSet alternatives.
+
+    e.g. `^0.8.20` becomes [SpecifierSet(">=0.8.20,<0.9.0")]; `||` separated
+    ranges become one SpecifierSet each.
+    """
+
+    alternatives = []
+    for alternative in spec.split("||"):
+        specifiers = []
+        for operator, version in PRAGMA_TERM_REGEX.findall(alternative):
+            specifiers += _term_specifiers(operator, version)
+        alternatives.append(SpecifierSet(",".join(specifiers)))
+    return alternatives
+
+
+def pragma_allows(constraints: list, version: Version) -> bool:
+    return all(
+        any(version in alternative for alternative in alternatives)
+        for alternatives in constraints
+    )
+
+
+def installed_solc_versions() -> list:
+    """Locally installed solc versions, newest first, without network."""
+
+    global _installed
+    folder = solcx.get_solcx_install_folder(Config.SOLC_PATH)
+    try:
+        stamp = folder.stat().st_mtime_ns
+    except OSError:
+        stamp = None
+    if stamp is None or stamp != _installed[0]:
+        versions = solcx.get_installed_solc_versions(Config.SOLC_PATH)
+        _installed = (stamp, sorted(versions, reverse=True))
+    return _installed[1]
+
+
+def solc_installed(version: str) -> bool:
+    """Check the local solcx install folder for `version`, without network."""
+
+    return Version(str(version)) in installed_solc_versions()
+
+
+def ensure_solc(version: str = Config.SOLIDITY_VERSION) -> bool:
+    """Make sure solc `version` is available, installing it only if missing.
+
+    Returns True if anything had to be installed (a cold start).
+    """
+
+    with _solc_lock:
+        if solc_installed(version):
+            return False
+
+        # a system-wide solc of the right version is as good as a download
+        try:
+            solcx.import_installed_solc(Config.SOLC_PATH)
+        except Exception:
+            pass
+        if not solc_installed(version):
+            if Config.OFFLINE:
+                raise ToolchainUnavailable(
+                    f"solc {version} is not installed and SNEKO_OFFLINE is set. "
+                    f"Copy a solc-v{version} binary into "
+                    f"{solcx.get_solcx_install_folder(Config.SOLC_PATH)} to "
+                    "compile Solidity."
+                )
+            solcx.install_solc(version, solcx_binary_path=Config.SOLC_PATH)
+        return True
+
+
+def select_solc_version(sources, install: bool = True):
+    """The newest installed solc satisfying every `pragma solidity` in sources.
+
+    Falls back to Config.SOLIDITY_VERSION (installing it if `install` and
+    not offline) when no installed version fits. Returns None if nothing
+    fits and `install` is False; raises ToolchainUnavailable otherwise.
+    """
+
+    constraints = [
+        parse_solidity_pragma(spec)
+        for text in sources
+        for spec in SOLIDITY_PRAGMA_REGEX.findall(text)
+    ]
+    for version in installed_solc_versions():
+        if pragma_allows(constraints, version):
+            return version
+
+    if not install:
+        return None
+    default = Version(Config.SOLIDITY_VERSION)
+    if pragma_allows(constraints, default):
+        ensure_solc(str(default))
+        return default
+
+    installed = ", ".join(str(v) for v in installed_solc_versions()) or "none"
+    raise ToolchainUnavailable(
+        "No installed solc satisfies this contract's pragma "
+        f"(installed: {installed}). Add a matching binary to "
+        f"{solcx.get_solcx_install_folder(Config.SOLC_PATH)}."
+    )
+
+
+def solc_binary(version: Version):
+    """Path to the solc binary for `version`, resolved once per session."""
+
+    binary = _solc_binaries.get(version)
+    if binary is None or not binary.exists():
+        binary = solcx.install.get_executable(version, Config.SOLC_PATH)
+        _solc_binaries[version] = binary
+    return binary
+
+
+def load_grammar(language: str):
+    """Load a tree-sitter grammar, building it first if it isn't prebuilt.
+
+    Returns a (language, installed) tuple; language is None if the grammar
+    is unavailable in offline mode.
+    """
+
+    repo_url, parser_name = GRAMMARS[language]
+    try:
+        return tst.load_language(parser_name, language), False
+    except FileNotFoundError:
+        if Config.OFFLINE:
+            return None, False
+
+    tst.install_parser(repo_url, parser_name)
+    return tst.load_language(parser_name, language), True